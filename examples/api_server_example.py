@@ -11,7 +11,8 @@ import json
 import requests
 import time
 import argparse
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
 from http.server import HTTPServer
 
 # Add parent directory to Python path so we can import agent_sdk directly
@@ -29,22 +30,43 @@ class AgentforceClient:
     A client for interacting with the AgentForce MCP Server.
     """
     
-    def __init__(self, base_url: str = SERVER_URL, auth_token: Optional[str] = None):
+    def __init__(
+        self,
+        base_url: str = SERVER_URL,
+        auth_token: Optional[str] = None,
+        pool_size: int = 10,
+        timeout: Tuple[float, Optional[float]] = (10, None)
+    ):
         """
         Initialize the client.
         
         Args:
             base_url: The base URL of the MCP server
             auth_token: Optional authentication token
+            pool_size: Maximum number of keep-alive connections kept open to the server
+            timeout: (connect, read) timeouts in seconds, a read timeout of None waits
+                for long running deployments to finish
         """
         self.base_url = base_url
         self.auth_token = auth_token
         self.client_id = None
+        self.timeout = timeout
         
         # Set up headers
         self.headers = {"Content-Type": "application/json"}
         if auth_token:
             self.headers["Authorization"] = f"Bearer {auth_token}"
+
+        # Reuse keep-alive connections (and their TLS sessions) across requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(self.headers)
+
+    def close(self) -> None:
+        """Close the pooled connections to the server."""
+        self.session.close()
     
     def _make_request(self, method: str, path: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
         """
@@ -68,11 +90,11 @@ class AgentforceClient:
             data["client_id"] = self.client_id
         
         # Make the request
-        response = requests.request(
+        response = self.session.request(
             method=method,
             url=url,
-            headers=self.headers,
-            json=data
+            json=data,
+            timeout=self.timeout
         )
         
         # Parse the response
@@ -321,6 +343,8 @@ def main():
         
     except Exception as e:
         print(f"Error: {str(e)}")
+    finally:
+        client.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+"""
+Example: Deploy one agent to many orgs in parallel
+
+The orgs are read from a JSON file containing a list of org entries, for example:
+
+[
+    {"name": "qa", "auth_type": "basic", "username": "...", "password": "...", "security_token": "..."},
+    {"name": "uat", "auth_type": "client-credentials", "client_id": "...", "client_secret": "...", "domain": "uat.my.salesforce.com"},
+    {"name": "prod", "auth_type": "jwt", "client_id": "...", "username": "...", "private_key_path": "...", "domain": "login"}
+]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+# Add parent directory to Python path so we can import agent_sdk directly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agent_sdk import Agentforce
+from agent_sdk.models.agent import Agent
+from agent_sdk.core.auth import BasicAuth, ClientCredentialsAuth, JwtBearerAuth
+from agent_sdk.utils.agent_utils import AgentUtils
+
+def create_auth(org: Dict[str, Any]):
+    """Create the authentication object of an org entry."""
+    auth_type = org.get('auth_type', 'basic')
+    if auth_type == 'basic':
+        return BasicAuth(
+            username=org['username'],
+            password=org['password'],
+            security_token=org.get('security_token')
+        )
+    if auth_type == 'client-credentials':
+        return ClientCredentialsAuth(
+            consumer_key=org['client_id'],
+            consumer_secret=org['client_secret'],
+            domain=org['domain']
+        )
+    if auth_type == 'jwt':
+        return JwtBearerAuth(
+            username=org['username'],
+            consumer_key=org['client_id'],
+            private_key_path=org['private_key_path'],
+            domain=org.get('domain', 'login')
+        )
+    raise ValueError(f"Unsupported auth_type '{auth_type}' for org '{org.get('name')}'")
+
+def deploy_to_org(org: Dict[str, Any], agent: Agent, dependent_metadata_dir: Optional[str]) -> Dict[str, Any]:
+    """Deploy the agent to one org and return its report entry."""
+    name = org.get('name') or org.get('username') or org.get('domain')
+    started = time.monotonic()
+    report = {'org': name, 'status': 'Failed', 'deployment_id': None, 'error': None}
+    try:
+        agentforce = Agentforce(auth=create_auth(org))
+        # Each deployment gets its own copy in case create() modifies the agent
+        agent = agent.model_copy(deep=True)
+        if dependent_metadata_dir:
+            result = agentforce.create(agent, dependent_metadata_dir=dependent_metadata_dir)
+        else:
+            result = agentforce.create(agent)
+
+        if result is None:
+            report['error'] = 'Creation failed before deployment could start'
+        else:
+            report['status'] = (result.get('deployResult') or {}).get('status') or 'Failed'
+            report['deployment_id'] = result.get('id')
+            if report['status'] != 'Succeeded':
+                report['error'] = str(result)
+    except Exception as e:
+        report['error'] = str(e)
+    report['duration_seconds'] = round(time.monotonic() - started, 1)
+    return report
+
+def deploy_to_orgs(
+    agent: Agent,
+    orgs: List[Dict[str, Any]],
+    dependent_metadata_dir: Optional[str] = None,
+    max_parallel: int = 4
+) -> List[Dict[str, Any]]:
+    """
+    Deploy the same agent to several orgs concurrently.
+
+    Args:
+        agent: The agent to deploy, built once and copied for each deployment
+        orgs: The org entries to deploy to
+        dependent_metadata_dir: Optional directory of metadata the agent depends on
+        max_parallel: Maximum number of deployments running at once
+
+    Returns:
+        One report entry per org, in the order of `orgs`
+    """
+    reports = {}
+    with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+        futures = {
+            executor.submit(deploy_to_org, org, agent, dependent_metadata_dir): index
+            for index, org in enumerate(orgs)
+        }
+        for future in as_completed(futures):
+            report = future.result()
+            print(f"[{report['org']}] {report['status']} in {report['duration_seconds']}s")
+            reports[futures[future]] = report
+    return [reports[index] for index in range(len(orgs))]
+
+def main():
+    parser = argparse.ArgumentParser(description='Deploy one AgentForce agent to many orgs in parallel')
+    parser.add_argument('--json_file', required=True, help='Path to the JSON file containing agent configuration')
+    parser.add_argument('--orgs_file', required=True, help='Path to the JSON file listing the orgs to deploy to')
+    parser.add_argument('--dependent_metadata_dir', help='Directory of metadata the agent depends on (optional)')
+    parser.add_argument('--max_parallel', type=int, default=4, help='Maximum number of orgs deployed at once')
+    parser.add_argument('--report_file', help='Write the per-org report to this JSON file (optional)')
+    args = parser.parse_args()
+
+    with open(args.orgs_file, 'r') as f:
+        orgs = json.load(f)
+
+    # Build the agent once and deploy the same definition everywhere
+    print(f"Loading agent definition from: {args.json_file}")
+    agent = AgentUtils.create_agent_from_file(args.json_file)
+
+    print(f"Deploying agent '{agent.name}' to {len(orgs)} orgs, {args.max_parallel} at a time...")
+    reports = deploy_to_orgs(agent, orgs, args.dependent_metadata_dir, args.max_parallel)
+
+    print("\nDeployment report:")
+    for report in reports:
+        line = f"  {report['org']:<30} {report['status']:<12} {report['duration_seconds']:>7}s"
+        if report['error']:
+            line += f"  {report['error']}"
+        print(line)
+
+    if args.report_file:
+        with open(args.report_file, 'w') as f:
+            json.dump(reports, f, indent=2)
+
+    failed = [report['org'] for report in reports if report['status'] != 'Succeeded']
+    if failed:
+        raise RuntimeError(f"Deployment did not succeed for orgs: {', '.join(failed)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from agent_sdk.core.agentforce import Agentforce
+from agent_sdk.core.auth import BasicAuth
+from ai_assist.models import SalesforceCredentials
+from ai_assist.rate_limit import RateLimiter
+from ai_assist.retry import CircuitBreaker, RetryPolicy, is_transient
+from ai_assist.session_cache import SessionCache, DEFAULT_SESSION_TTL
+
+logger = logging.getLogger(__name__)
+
+INVALID_SESSION_ERROR = "INVALID_SESSION_ID"
+
+T = TypeVar("T")
+
+
+def is_invalid_session(error: Exception) -> bool:
+    """Return True if an error was caused by an expired or revoked Salesforce session."""
+    return INVALID_SESSION_ERROR in str(error)
+
+
+class SalesforceConnection:
+    """
+    Shared Agentforce client for one set of Salesforce credentials.
+
+    No login happens until the first call that needs the org, or until
+    `connect` is called explicitly. The client is safe to use from several
+    threads. When a call fails with INVALID_SESSION_ID, exactly one thread logs
+    in again while the others wait for the new session, then every failed call
+    is replayed once.
+    """
+
+    def __init__(
+        self,
+        credentials: SalesforceCredentials,
+        session_cache: Optional[SessionCache] = None,
+        session_ttl: Optional[int] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None
+    ):
+        """
+        Initialize the connection.
+
+        Args:
+            credentials: The Salesforce credentials to log in with
+            session_cache: Optional on-disk cache used to share sessions between processes
+            session_ttl: Number of seconds a session is expected to stay valid, defaults
+                to the session cache TTL or the Salesforce default of two hours
+            rate_limiter: Optional limiter throttling API requests to the org's API budget
+            retry_policy: Optional policy retrying calls that fail with transient errors
+        """
+        self.credentials = credentials
+        self.session_cache = session_cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        if session_ttl is None:
+            session_ttl = session_cache.ttl if session_cache is not None else DEFAULT_SESSION_TTL
+        self.session_ttl = session_ttl
+        self._client: Optional[Agentforce] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._renewal_stop: Optional[threading.Event] = None
+        self._renewal_thread: Optional[threading.Thread] = None
+        self._throttled = False
+
+        # Metrics
+        self.refresh_count = 0
+        self.refresh_latency_total = 0.0
+        self.last_refresh_latency: Optional[float] = None
+        self.retry_count = 0
+        # Password logins, sessions reused from the cache are not counted
+        self.login_count = 0
+
+    @property
+    def cache_key(self) -> str:
+        """The session cache key of the credentials."""
+        return SessionCache.key(self.credentials.username, self.credentials.domain, "basic")
+
+    def client(self) -> Agentforce:
+        """Return the current Agentforce client, logging in if there is none yet."""
+        client = self._client
+        if client is not None:
+            return client
+        with self._lock:
+            if self._client is None:
+                self._client, self._expires_at = self._login()
+            return self._client
+
+    @property
+    def current_client(self) -> Optional[Agentforce]:
+        """The current Agentforce client, or None when not logged in yet."""
+        return self._client
+
+    def connect(self) -> Agentforce:
+        """
+        Log in up front instead of on the first call that needs the org.
+
+        Returns:
+            The Agentforce client
+        """
+        client = self.client()
+        if self.rate_limiter is not None:
+            self.rate_limiter.poll(client)
+        return client
+
+    def refresh(self, stale: Agentforce) -> Agentforce:
+        """
+        Replace a client whose session was rejected by Salesforce.
+
+        Args:
+            stale: The client whose call failed with INVALID_SESSION_ID
+        Returns:
+            A client holding a valid session
+        """
+        with self._lock:
+            if self._client is not None and self._client is not stale:
+                # Another thread already logged in again while we were waiting
+                return self._client
+            logger.info("Salesforce session is no longer valid, logging in again")
+            self._renew(stale)
+            return self._client
+
+    def renew(self) -> None:
+        """Log in again ahead of the current session expiring."""
+        with self._lock:
+            if self._client is not None:
+                self._renew(self._client)
+
+    @property
+    def expires_in(self) -> Optional[float]:
+        """Seconds until the current session is expected to expire, or None when not logged in."""
+        if self._client is None:
+            return None
+        return self._expires_at - time.time()
+
+    def start_renewal(self, margin: int = 300, interval: int = 60) -> None:
+        """
+        Start a background thread that renews the session before it expires.
+
+        Args:
+            margin: Renew when the session expires in less than this many seconds
+            interval: Number of seconds between expiry checks
+        """
+        if self._renewal_thread is not None:
+            return
+        self._renewal_stop = threading.Event()
+        self._renewal_thread = threading.Thread(
+            target=self._renewal_loop,
+            args=(self._renewal_stop, margin, interval),
+            name="salesforce-session-renewal",
+            daemon=True
+        )
+        self._renewal_thread.start()
+
+    @property
+    def renewing(self) -> bool:
+        """Whether the session is renewed in the background."""
+        return self._renewal_thread is not None
+
+    def stop_renewal(self) -> None:
+        """Stop the background renewal thread."""
+        if self._renewal_thread is None:
+            return
+        self._renewal_stop.set()
+        self._renewal_thread.join()
+        self._renewal_stop = None
+        self._renewal_thread = None
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return session refresh metrics."""
+        return {
+            "logged_in": self._client is not None,
+            "expires_in": self.expires_in,
+            "refresh_count": self.refresh_count,
+            "refresh_latency_total": self.refresh_latency_total,
+            "last_refresh_latency": self.last_refresh_latency,
+            "rate_limit": self.rate_limiter.metrics() if self.rate_limiter is not None else None,
+            "retry_count": self.retry_count,
+            "circuit_breakers": {endpoint: breaker.metrics() for endpoint, breaker in self._breakers.items()},
+        }
+
+    def call(
+        self,
+        operation: Callable[[Agentforce], T],
+        endpoint: str = "default",
+        idempotent: bool = True,
+        stale: Optional[Callable[[T], bool]] = None
+    ) -> T:
+        """
+        Run an operation with the shared client.
+
+        The operation is replayed once after a session refresh, and retried with
+        jittered backoff on transient errors when a retry policy is configured.
+        Calls are rejected with CircuitOpenError while the endpoint's circuit
+        breaker is open.
+
+        Args:
+            operation: Callable receiving the Agentforce client
+            endpoint: Name of the Salesforce endpoint the operation calls, used to
+                keep a circuit breaker per endpoint
+            idempotent: Whether the operation can safely be repeated
+            stale: Optional predicate recognizing a result the operation returns instead of
+                raising when the session was rejected. Such a result from a session logged in
+                before the call, e.g. a cached one, refreshes the session and replays once
+        Returns:
+            The result of the operation
+        """
+        breaker = self._breakers.setdefault(endpoint, CircuitBreaker())
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            breaker.before_call()
+            attempt += 1
+            try:
+                result = self._call_once(operation, stale)
+            except Exception as e:
+                if not is_transient(e):
+                    # Salesforce answered, the endpoint itself is healthy
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                elapsed = time.monotonic() - started
+                if self.retry_policy is None or not self.retry_policy.should_retry(e, attempt, elapsed, idempotent):
+                    raise
+                delay = self.retry_policy.delay(attempt)
+                self.retry_count += 1
+                logger.warning(f"Transient error calling {endpoint}, retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+                continue
+            breaker.record_success()
+            return result
+
+    def _call_once(self, operation: Callable[[Agentforce], T], stale: Optional[Callable[[T], bool]] = None) -> T:
+        logins = self.login_count
+        client = self.client()
+        try:
+            result = self._run(operation, client)
+        except Exception as e:
+            if not is_invalid_session(e):
+                raise
+            return self._run(operation, self.refresh(client))
+        if stale is not None and self.login_count == logins and stale(result):
+            # A password login during this call is trusted, an older or cached session may have been revoked
+            logger.info("Salesforce call failed with a session logged in earlier, logging in again")
+            return self._run(operation, self.refresh(client))
+        return result
+
+    def _run(self, operation: Callable[[Agentforce], T], client: Agentforce) -> T:
+        if self.rate_limiter is None or self._throttled:
+            # Instrumented clients are throttled per HTTP request instead
+            return operation(client)
+        self.rate_limiter.acquire()
+        try:
+            return operation(client)
+        finally:
+            self.rate_limiter.update_from_client(client)
+
+    def _renewal_loop(self, stop: threading.Event, margin: int, interval: int) -> None:
+        while not stop.wait(interval):
+            expires_in = self.expires_in
+            if expires_in is None or expires_in > margin:
+                continue
+            try:
+                self.renew()
+            except Exception as e:
+                logger.error(f"Error renewing the Salesforce session: {e}")
+
+    def _renew(self, stale: Agentforce) -> None:
+        # Must be called with the lock held
+        if self.session_cache is not None:
+            self.session_cache.invalidate(self.cache_key, stale.session_id)
+        started = time.monotonic()
+        self._client, self._expires_at = self._login()
+        latency = time.monotonic() - started
+        self.refresh_count += 1
+        self.refresh_latency_total += latency
+        self.last_refresh_latency = latency
+        logger.debug(f"Refreshed Salesforce session in {latency:.2f}s")
+
+    def _login(self) -> Tuple[Agentforce, float]:
+        client, expires_at = self._new_client()
+        if self.rate_limiter is not None:
+            self._throttled = self.rate_limiter.instrument(client)
+        return client, expires_at
+
+    def _new_client(self) -> Tuple[Agentforce, float]:
+        if self.session_cache is not None:
+            cached = self.session_cache.get(self.cache_key)
+            if cached is not None:
+                logger.debug(f"Reusing cached Salesforce session for {self.credentials.username}")
+                client = Agentforce(session_id=cached.session_id, instance_url=cached.instance_url)
+                return client, cached.expires_at
+
+        basic_auth = BasicAuth(
+            username=self.credentials.username,
+            password=self.credentials.password,
+            domain=self.credentials.domain
+        )
+        client = Agentforce(auth=basic_auth)
+        self.login_count += 1
+        expires_at = time.time() + self.session_ttl
+        if self.session_cache is not None:
+            expires_at = self.session_cache.put(self.cache_key, client.instance_url, client.session_id).expires_at
+        return client, expires_at
@@ -0,0 +1,69 @@
+import hashlib
+import json
+import time
+from importlib import metadata
+from typing import Any, Optional
+
+from agent_sdk.models.agent import Agent
+from ai_assist.file_store import LockedJsonFile
+
+
+def _sdk_version() -> str:
+    try:
+        return metadata.version("agentforce-sdk")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def agent_hash(agent: Agent) -> str:
+    """
+    Return a stable content hash of an agent definition.
+
+    The SDK version is part of the hash, so upgrading the SDK, which may change the
+    generated metadata, redeploys every agent once.
+    """
+    payload = json.dumps(
+        {"sdk_version": _sdk_version(), "agent": agent.model_dump(mode="json")},
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def deployment_succeeded(result: Any) -> bool:
+    """Return True if an Agentforce.create result reports a successful deployment."""
+    return isinstance(result, dict) and (result.get("deployResult") or {}).get("status") == "Succeeded"
+
+
+class DeployHashStore:
+    """
+    On-disk record of the content hash of the last successful deployment of each agent
+    to each org, used to skip deploying agents that did not change.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the store.
+
+        Args:
+            path: Path of the JSON file used to store the hashes
+        """
+        self.store = LockedJsonFile(path)
+
+    @staticmethod
+    def key(org: str, agent_name: str) -> str:
+        """Build the store key for an agent in an org."""
+        return f"{org}:{agent_name}"
+
+    def get(self, org: str, agent_name: str) -> Optional[str]:
+        """Return the hash of the last successful deployment of an agent to an org."""
+        with self.store.locked():
+            entry = self.store.read().get(self.key(org, agent_name))
+        return entry["hash"] if entry else None
+
+    def record(self, org: str, agent_name: str, digest: str) -> None:
+        """Record the hash of a successful deployment."""
+        with self.store.locked():
+            entries = self.store.read()
+            entries[self.key(org, agent_name)] = {"hash": digest, "deployed_at": time.time()}
+            self.store.write(entries)
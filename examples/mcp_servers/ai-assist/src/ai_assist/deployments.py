@@ -0,0 +1,293 @@
+import asyncio
+import concurrent.futures
+import heapq
+import itertools
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ai_assist.models import DeploymentState
+
+logger = logging.getLogger(__name__)
+
+
+class DeploymentHandle:
+    """Handle on a deployment queued or running in the background."""
+
+    QUEUED = "Queued"
+    IN_PROGRESS = "InProgress"
+    CANCELED = "Canceled"
+    FAILED = "Failed"
+
+    def __init__(self, deployment_id: str, agent_name: str, future: "concurrent.futures.Future[DeploymentState]"):
+        self.deployment_id = deployment_id
+        self.agent_name = agent_name
+        self._future = future
+
+    def status(self) -> str:
+        """
+        Return the deployment status.
+
+        Returns:
+            Queued, InProgress or Canceled while the deployment has no result, otherwise
+            the status reported by Salesforce (e.g. Succeeded), Skipped or Failed
+        """
+        if self._future.cancelled():
+            return self.CANCELED
+        if not self._future.done():
+            return self.IN_PROGRESS if self._future.running() else self.QUEUED
+        if self._future.exception() is not None:
+            return self.FAILED
+        result = self._future.result().deployment_result
+        if isinstance(result, dict):
+            return (result.get("deployResult") or {}).get("status") or result.get("status") or self.FAILED
+        return self.FAILED
+
+    def done(self) -> bool:
+        """Return True once the deployment finished or was canceled."""
+        return self._future.done()
+
+    def wait(self, timeout: Optional[float] = None) -> DeploymentState:
+        """
+        Block until the deployment finishes.
+
+        Args:
+            timeout: Maximum number of seconds to wait
+        Returns:
+            The deployment state
+        Raises:
+            TimeoutError: If the deployment did not finish within the timeout
+            CancelledError: If the deployment was canceled
+        """
+        return self._future.result(timeout=timeout)
+
+    async def wait_async(self, timeout: Optional[float] = None) -> DeploymentState:
+        """
+        Wait for the deployment to finish without blocking the event loop.
+
+        Timing out or canceling the wait leaves the deployment running.
+        """
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(self._future)), timeout=timeout)
+
+    def cancel(self) -> bool:
+        """
+        Cancel the deployment if it has not started yet.
+
+        A deployment already submitted to Salesforce cannot be canceled. When deployments
+        were coalesced, only this handle is canceled; the shared deployment is skipped once
+        none of its handles is waiting for it anymore.
+
+        Returns:
+            True if the deployment was canceled
+        """
+        return self._future.cancel()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the handle as a JSON-serializable dictionary."""
+        data: Dict[str, Any] = {
+            "deployment_id": self.deployment_id,
+            "agent_name": self.agent_name,
+            "status": self.status(),
+        }
+        if self._future.done() and not self._future.cancelled():
+            error = self._future.exception()
+            if error is not None:
+                data["error"] = str(error)
+            else:
+                state = self._future.result()
+                data["deployment_result"] = state.deployment_result
+                data["login_url"] = state.login_url
+                data["component_failures"] = [failure.model_dump() for failure in state.component_failures]
+                data["timings"] = state.timings
+        return data
+
+
+class _DeploymentJob:
+    """A deployment waiting in, or taken from, an org queue."""
+
+    def __init__(self, org: str, agent_name: str, deploy: Callable[[float], DeploymentState]):
+        self.org = org
+        self.agent_name = agent_name
+        self.deploy = deploy
+        # Coalesced deployments keep the time of the first request
+        self.queued_at = time.monotonic()
+        # One future per handle, so canceling a handle does not cancel the others
+        self.futures: List["concurrent.futures.Future[DeploymentState]"] = []
+
+    @property
+    def canceled(self) -> bool:
+        """Whether every handle waiting for the deployment was canceled."""
+        return all(future.cancelled() for future in self.futures)
+
+
+class _OrgQueue:
+    """Deployments of one org, run one at a time in priority order."""
+
+    def __init__(self):
+        self.heap: List[list] = []
+        self.running: Optional[_DeploymentJob] = None
+        self.draining = False
+        self.completed = 0
+
+
+class DeploymentManager:
+    """
+    Schedules deployments in the background and tracks them by id.
+
+    Salesforce runs one metadata deployment per org at a time, so deployments to the
+    same org run one after the other, highest priority first, while deployments to
+    different orgs run in parallel on up to `max_workers` threads. A deployment of an
+    agent that is still queued is replaced by a newer deployment of the same agent to
+    the same org, and all its handles receive the result of the latest one.
+    """
+
+    def __init__(self, max_workers: int = 4, max_history: int = 1000):
+        """
+        Initialize the manager.
+
+        Args:
+            max_workers: Maximum number of orgs deployed to at once
+            max_history: Number of finished deployments kept for status lookups
+        """
+        self.max_history = max_history
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="deploy")
+        self._handles: Dict[str, DeploymentHandle] = {}
+        self._queues: Dict[str, _OrgQueue] = {}
+        self._pending: Dict[Tuple[str, str], list] = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.coalesced = 0
+
+    def start(
+        self,
+        agent_name: str,
+        deploy: Callable[[float], DeploymentState],
+        org: str = "default",
+        priority: int = 0
+    ) -> DeploymentHandle:
+        """
+        Queue a deployment.
+
+        Args:
+            agent_name: Name of the deployed agent
+            deploy: Callable performing the deployment, receiving the seconds it waited in the queue
+            org: Key of the org deployed to, deployments to the same org run one at a time
+            priority: Deployments with a higher priority run first within an org
+        Returns:
+            The handle of the deployment
+        """
+        deployment_id = uuid.uuid4().hex
+        with self._lock:
+            queue = self._queues.setdefault(org, _OrgQueue())
+            entry = self._pending.get((org, agent_name))
+            if entry is not None and entry[2].canceled:
+                # Never coalesce into a canceled deployment, it would never run
+                del self._pending[(org, agent_name)]
+                entry = None
+            if entry is not None:
+                # Latest wins: the queued deployment now deploys the newest definition
+                entry[2].deploy = deploy
+                if -priority < entry[0]:
+                    entry[0] = -priority
+                    heapq.heapify(queue.heap)
+                self.coalesced += 1
+                job = entry[2]
+                logger.info(f"Coalesced deployment {deployment_id} of agent {agent_name} with a queued deployment")
+            else:
+                job = _DeploymentJob(org, agent_name, deploy)
+                entry = [-priority, next(self._sequence), job]
+                heapq.heappush(queue.heap, entry)
+                self._pending[(org, agent_name)] = entry
+            future: "concurrent.futures.Future[DeploymentState]" = concurrent.futures.Future()
+            job.futures.append(future)
+            handle = DeploymentHandle(deployment_id, agent_name, future)
+            self._handles[deployment_id] = handle
+            self._prune_history()
+            if not queue.draining:
+                queue.draining = True
+                self._executor.submit(self._drain, org)
+        logger.info(f"Queued deployment {deployment_id} of agent {agent_name}")
+        return handle
+
+    def get(self, deployment_id: str) -> Optional[DeploymentHandle]:
+        """Return the handle of a deployment, or None if the id is unknown."""
+        with self._lock:
+            return self._handles.get(deployment_id)
+
+    def handles(self) -> Dict[str, DeploymentHandle]:
+        """Return all tracked deployments by id."""
+        with self._lock:
+            return dict(self._handles)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return queue depth, running deployment and completed count per org."""
+        with self._lock:
+            orgs = {
+                org: {
+                    "queued": sum(1 for entry in queue.heap if not entry[2].canceled),
+                    "running": queue.running.agent_name if queue.running is not None else None,
+                    "completed": queue.completed,
+                }
+                for org, queue in self._queues.items()
+            }
+        return {
+            "queued": sum(org["queued"] for org in orgs.values()),
+            "running": sum(1 for org in orgs.values() if org["running"] is not None),
+            "coalesced": self.coalesced,
+            "orgs": orgs,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting deployments and optionally wait for running ones, queued ones are canceled otherwise."""
+        if not wait:
+            with self._lock:
+                for queue in self._queues.values():
+                    for entry in queue.heap:
+                        for future in entry[2].futures:
+                            future.cancel()
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _drain(self, org: str) -> None:
+        # Runs the deployments of one org until its queue is empty
+        while True:
+            with self._lock:
+                queue = self._queues[org]
+                job = None
+                while queue.heap:
+                    entry = heapq.heappop(queue.heap)
+                    if self._pending.get((org, entry[2].agent_name)) is entry:
+                        del self._pending[(org, entry[2].agent_name)]
+                    # Start the handles still waiting, the job is skipped if all were canceled
+                    futures = [future for future in entry[2].futures if future.set_running_or_notify_cancel()]
+                    if futures:
+                        job = entry[2]
+                        break
+                if job is None:
+                    queue.draining = False
+                    return
+                queue.running = job
+            try:
+                result = job.deploy(time.monotonic() - job.queued_at)
+            except BaseException as e:
+                logger.error(f"Deployment of agent {job.agent_name} failed: {e}")
+                for future in futures:
+                    future.set_exception(e)
+            else:
+                for future in futures:
+                    future.set_result(result)
+            finally:
+                with self._lock:
+                    queue.running = None
+                    queue.completed += 1
+
+    def _prune_history(self) -> None:
+        # Must be called with the lock held, forgets the oldest finished deployments
+        excess = len(self._handles) - self.max_history
+        if excess <= 0:
+            return
+        for deployment_id in [i for i, handle in self._handles.items() if handle.done()][:excess]:
+            del self._handles[deployment_id]
@@ -0,0 +1,67 @@
+import contextlib
+import json
+import logging
+import os
+from typing import Dict, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+class LockedJsonFile:
+    """JSON object stored in a file, shared between processes through a lock file."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the store.
+
+        Args:
+            path: Path of the JSON file
+        """
+        self.path = os.path.expanduser(path)
+
+    @contextlib.contextmanager
+    def locked(self) -> Iterator[None]:
+        """Hold an exclusive lock on the file across processes."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(f"{self.path}.lock", "a+") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def read(self) -> Dict[str, dict]:
+        """Return the stored entries, must be called with the lock held."""
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable file {self.path}: {e}")
+            return {}
+
+    def write(self, entries: Dict[str, dict]) -> None:
+        """Replace the stored entries, must be called with the lock held."""
+        tmp_path = f"{self.path}.tmp"
+        # Entries may hold access tokens, keep the file private to the current user
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
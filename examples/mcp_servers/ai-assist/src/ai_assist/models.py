@@ -12,11 +12,38 @@ class SalesforceCredentials(BaseModel):
     domain: str = Field(description="The domain of the Salesforce user", default="login")
 
 
+class ComponentFailure(BaseModel):
+    """A metadata component that failed to deploy."""
+    component_type: Optional[str] = Field(default=None, description="Metadata type of the component, e.g. GenAiFunction")
+    full_name: Optional[str] = Field(default=None, description="Full name of the component")
+    problem: Optional[str] = Field(default=None, description="Error reported by Salesforce")
+    problem_type: Optional[str] = Field(default=None, description="Error or Warning")
+    file_name: Optional[str] = Field(default=None, description="File of the component in the deploy package")
+    line_number: Optional[int] = Field(default=None, description="Line of the problem in the file, if any")
+
+
 class DeploymentState(BaseModel):
     """Tracks the deployment state of an agent including its metadata and credentials."""
     agent: Agent = Field(description="The deployed agent")
     deployment_result: Optional[Any] = Field(default=None, description="Result of the deployment")
     login_url: Optional[str] = Field(default=None, description="The login URL of the Salesforce instance")
+    component_failures: List[ComponentFailure] = Field(default_factory=list, description="Components that failed to deploy")
+    timings: Dict[str, float] = Field(default_factory=dict, description="Seconds spent in each phase of the deployment")
+
+
+class CachedSession(BaseModel):
+    """A Salesforce session stored in the on-disk session cache."""
+    instance_url: str = Field(description="The Salesforce instance URL of the session")
+    session_id: str = Field(description="The session id / access token")
+    expires_at: float = Field(description="Unix timestamp after which the session is no longer reused")
+
+
+class ValidationIssue(BaseModel):
+    """A problem found in an agent definition before deployment."""
+    code: str = Field(description="Identifier of the validation rule that failed")
+    path: str = Field(description="Location of the problem in the agent definition")
+    message: str = Field(description="Description of the problem")
+    severity: str = Field(default="error", description="error if the deployment is certain to fail, warning if it may fail")
 
 
 # Agent Metadata
@@ -0,0 +1,166 @@
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from requests.adapters import BaseAdapter
+
+logger = logging.getLogger(__name__)
+
+_API_USAGE = re.compile(r"(?:^|[\s;,])api-usage=(\d+)/(\d+)")
+
+
+class ThrottledAdapter(BaseAdapter):
+    """Transport adapter taking a rate limiter token before every HTTP request it sends."""
+
+    def __init__(self, limiter: "RateLimiter", adapter: BaseAdapter):
+        super().__init__()
+        self.limiter = limiter
+        self.adapter = adapter
+
+    def send(self, request, **kwargs):
+        self.limiter.acquire()
+        response = self.adapter.send(request, **kwargs)
+        self.limiter.update_from_header(response.headers.get("Sforce-Limit-Info"))
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+
+class RateLimiter:
+    """
+    Token bucket throttling Salesforce API requests for one org, shared by all threads.
+
+    The refill rate adapts to the org's remaining daily API budget, as reported by
+    the Sforce-Limit-Info header or the /limits resource. It runs at full speed
+    while more than twice `reserve` of the budget is left and slows down linearly
+    to `min_rate_factor` of the rate as the budget reaches `reserve`.
+    """
+
+    def __init__(self, rate: float = 10.0, burst: int = 10, reserve: float = 0.1, min_rate_factor: float = 0.05):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate: Maximum number of API requests per second
+            burst: Maximum number of API requests allowed at once after being idle
+            reserve: Fraction of the daily API budget to keep for other integrations
+            min_rate_factor: Fraction of `rate` used once the budget reaches `reserve`
+        """
+        self.rate = rate
+        self.burst = burst
+        self.reserve = reserve
+        self.min_rate_factor = min_rate_factor
+        self.api_used: Optional[int] = None
+        self.api_total: Optional[int] = None
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.throttled_count = 0
+        self.throttled_seconds = 0.0
+
+    @property
+    def remaining(self) -> Optional[int]:
+        """Remaining daily API calls of the org, or None before the first report."""
+        if self.api_used is None or self.api_total is None:
+            return None
+        return max(self.api_total - self.api_used, 0)
+
+    @property
+    def current_rate(self) -> float:
+        """Calls per second currently allowed given the remaining API budget."""
+        remaining = self.remaining
+        if remaining is None or not self.api_total or not self.reserve:
+            return self.rate
+        fraction = remaining / self.api_total
+        factor = (fraction - self.reserve) / self.reserve
+        return self.rate * min(max(factor, self.min_rate_factor), 1.0)
+
+    def acquire(self) -> float:
+        """
+        Wait until a call may be made.
+
+        Returns:
+            Number of seconds spent waiting
+        """
+        with self._lock:
+            now = time.monotonic()
+            rate = self.current_rate
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            # Reserve the token now, callers queue up behind each other
+            self._tokens -= 1
+            wait = -self._tokens / rate if self._tokens < 0 else 0.0
+            if wait:
+                self.throttled_count += 1
+                self.throttled_seconds += wait
+        if wait:
+            logger.debug(f"Throttling Salesforce call for {wait:.2f}s, remaining API budget {self.remaining}")
+            time.sleep(wait)
+        return wait
+
+    def update(self, used: int, total: int) -> None:
+        """
+        Record the org's API usage.
+
+        Args:
+            used: Number of API calls used in the last 24 hours
+            total: Daily API call limit of the org
+        """
+        with self._lock:
+            self.api_used = used
+            self.api_total = total
+
+    def update_from_header(self, header: Optional[str]) -> None:
+        """Record the API usage of a Sforce-Limit-Info header such as `api-usage=18/5000`."""
+        match = _API_USAGE.search(header or "")
+        if match:
+            self.update(int(match.group(1)), int(match.group(2)))
+
+    def instrument(self, client: Any) -> bool:
+        """
+        Throttle every HTTP request a client sends to Salesforce.
+
+        Args:
+            client: The Agentforce client
+        Returns:
+            True if the client's HTTP session was instrumented, False if it exposes none
+        """
+        session = getattr(getattr(client, "sf", None), "session", None)
+        adapters = getattr(session, "adapters", None)
+        if adapters is None:
+            return False
+        for prefix, adapter in list(adapters.items()):
+            if not isinstance(adapter, ThrottledAdapter):
+                adapters[prefix] = ThrottledAdapter(self, adapter)
+        return True
+
+    def update_from_client(self, client: Any) -> None:
+        """Record the API usage parsed from the last Sforce-Limit-Info header seen by a client."""
+        sf = getattr(client, "sf", None)
+        usage = (getattr(sf, "api_usage", None) or {}).get("api-usage")
+        if usage is not None:
+            self.update(usage.used, usage.total)
+
+    def poll(self, client: Any) -> None:
+        """Record the API usage reported by the org's /limits resource, logging any error."""
+        try:
+            limits = client.sf.limits()["DailyApiRequests"]
+            self.update(limits["Max"] - limits["Remaining"], limits["Max"])
+        except Exception as e:
+            logger.warning(f"Could not read the API usage of the org: {e}")
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return API budget and throttling metrics."""
+        return {
+            "api_used": self.api_used,
+            "api_total": self.api_total,
+            "api_remaining": self.remaining,
+            "current_rate": self.current_rate,
+            "throttled_count": self.throttled_count,
+            "throttled_seconds": self.throttled_seconds,
+        }
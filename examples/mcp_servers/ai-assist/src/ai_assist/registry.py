@@ -0,0 +1,158 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from ai_assist.connection import SalesforceConnection
+from ai_assist.models import SalesforceCredentials
+from ai_assist.rate_limit import RateLimiter
+from ai_assist.retry import RetryPolicy
+from ai_assist.session_cache import SessionCache
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionRegistry:
+    """
+    Bounded cache of Salesforce connections, one per org login.
+
+    Connections are evicted least recently used first once `max_size` is reached,
+    and after staying unused for `idle_ttl` seconds unless their session is being
+    renewed in the background.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 100,
+        idle_ttl: Optional[float] = None,
+        session_cache: Optional[SessionCache] = None,
+        session_ttl: Optional[int] = None,
+        rate_limit: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            max_size: Maximum number of connections kept at once
+            idle_ttl: Number of seconds after which an unused connection is evicted, None to
+                keep connections until they are evicted by size
+            session_cache: Optional on-disk session cache shared by all connections
+            session_ttl: Number of seconds a session is expected to stay valid, defaults to
+                the session cache TTL or the Salesforce default of two hours
+            rate_limit: Optional maximum number of API requests per second to each org
+            retry_policy: Optional policy retrying calls that fail with transient errors
+        """
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self.session_cache = session_cache
+        self.session_ttl = session_ttl
+        self.rate_limit = rate_limit
+        self.retry_policy = retry_policy
+        self.renewal_margin: Optional[int] = None
+        self._connections: "OrderedDict[str, Tuple[SalesforceConnection, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, credentials: SalesforceCredentials) -> SalesforceConnection:
+        """
+        Return the connection for a set of credentials, creating it if needed.
+
+        Args:
+            credentials: The Salesforce credentials of the org
+        Returns:
+            The connection for the org
+        """
+        key = SessionCache.key(credentials.username, credentials.domain, "basic")
+        evicted = []
+        with self._lock:
+            now = time.monotonic()
+            evicted.extend(self._pop_idle(now))
+            entry = self._connections.get(key)
+            if entry is not None and entry[0].credentials == credentials:
+                self.hits += 1
+                connection = entry[0]
+            else:
+                self.misses += 1
+                if entry is not None:
+                    # The credentials of the org changed, drop the old connection
+                    evicted.append(entry[0])
+                rate_limiter = RateLimiter(rate=self.rate_limit) if self.rate_limit else None
+                connection = SalesforceConnection(
+                    credentials,
+                    session_cache=self.session_cache,
+                    session_ttl=self.session_ttl,
+                    rate_limiter=rate_limiter,
+                    retry_policy=self.retry_policy
+                )
+                if self.renewal_margin is not None:
+                    connection.start_renewal(margin=self.renewal_margin)
+            self._connections[key] = (connection, now)
+            self._connections.move_to_end(key)
+            while len(self._connections) > self.max_size:
+                _, (oldest, _) = self._connections.popitem(last=False)
+                self.evictions += 1
+                evicted.append(oldest)
+        for stale in evicted:
+            stale.stop_renewal()
+        return connection
+
+    def evict_idle(self) -> int:
+        """
+        Evict connections that have been unused for longer than `idle_ttl`.
+
+        Returns:
+            The number of evicted connections
+        """
+        with self._lock:
+            evicted = self._pop_idle(time.monotonic())
+        for stale in evicted:
+            stale.stop_renewal()
+        return len(evicted)
+
+    def start_renewal(self, margin: int = 300) -> None:
+        """
+        Renew sessions in the background for current and future connections.
+
+        Args:
+            margin: Renew when a session expires in less than this many seconds
+        """
+        with self._lock:
+            self.renewal_margin = margin
+            connections = [connection for connection, _ in self._connections.values()]
+        for connection in connections:
+            connection.start_renewal(margin=margin)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return registry size, hit/miss/eviction counts and per-connection metrics."""
+        with self._lock:
+            connections = dict(self._connections)
+        return {
+            "size": len(connections),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "connections": {key: connection.metrics() for key, (connection, _) in connections.items()},
+        }
+
+    def _pop_idle(self, now: float) -> List[SalesforceConnection]:
+        # Must be called with the lock held, entries are ordered by last use
+        evicted = []
+        if self.idle_ttl is None:
+            return evicted
+        for key, (connection, last_used) in list(self._connections.items()):
+            if now - last_used < self.idle_ttl:
+                break
+            if connection.renewing:
+                # Kept warm on purpose by --session-renewal
+                continue
+            del self._connections[key]
+            self.evictions += 1
+            evicted.append(connection)
+        return evicted
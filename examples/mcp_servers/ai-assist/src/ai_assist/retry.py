@@ -0,0 +1,147 @@
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Salesforce error codes that are safe to retry after a short wait
+TRANSIENT_ERRORS = ("UNABLE_TO_LOCK_ROW", "SERVER_UNAVAILABLE", "REQUEST_RUNNING_TOO_LONG")
+
+
+def is_transient(error: Exception) -> bool:
+    """Return True if an error is likely to go away when the call is retried."""
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    status = getattr(error, "status", None)
+    if isinstance(status, int) and status >= 500:
+        return True
+    message = str(error)
+    return any(code in message for code in TRANSIENT_ERRORS)
+
+
+class CircuitOpenError(Exception):
+    """Raised when calls to an endpoint are rejected because its circuit breaker is open."""
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for transient Salesforce errors."""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        max_elapsed: float = 120.0
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            max_attempts: Maximum number of attempts, including the first call
+            base_delay: Upper bound in seconds of the delay before the first retry
+            max_delay: Upper bound in seconds of any single delay
+            max_elapsed: No retry is started after this many seconds since the first attempt
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_elapsed = max_elapsed
+
+    def delay(self, attempt: int) -> float:
+        """Return a random delay before retry number `attempt`, starting at 1."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def should_retry(self, error: Exception, attempt: int, elapsed: float, idempotent: bool = True) -> bool:
+        """
+        Decide whether a failed call is retried.
+
+        Args:
+            error: The error raised by the call
+            attempt: Number of attempts made so far
+            elapsed: Seconds since the first attempt started
+            idempotent: Whether repeating the call has no additional effect. Calls that
+                are not idempotent are only retried when the connection could not be made
+        """
+        if attempt >= self.max_attempts or elapsed >= self.max_elapsed:
+            return False
+        if not idempotent:
+            return isinstance(error, requests.ConnectTimeout)
+        return is_transient(error)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one endpoint.
+
+    After `failure_threshold` consecutive transient failures the circuit opens and
+    calls are rejected for `reset_timeout` seconds. A single trial call is then let
+    through; the circuit closes again if it succeeds.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive transient failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_count = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if the call must not be made."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return
+            raise CircuitOpenError(
+                f"Circuit open after {self.failures} consecutive failures, retry in "
+                f"{max(self.reset_timeout - (time.monotonic() - self._opened_at), 0):.0f}s"
+            )
+
+    def record_success(self) -> None:
+        """Record a successful call."""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        """Record a transient failure."""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opened_count += 1
+                    logger.warning(f"Opening circuit breaker after {self.failures} consecutive failures")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_running = False
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the breaker state and counters."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opened_count": self.opened_count,
+        }
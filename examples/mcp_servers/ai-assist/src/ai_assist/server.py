@@ -2,16 +2,24 @@ import click
 from mcp.server.fastmcp import FastMCP
 from agent_sdk.models.agent import Agent 
 from agent_sdk.models.system_message import SystemMessage
-from typing import Dict, List
+from typing import Dict, List, Optional
 import os
+import json
 import asyncio
 import mcp.server.stdio
 from dotenv import load_dotenv
 from ai_assist.models import SalesforceCredentials, DeploymentState, AgentMetadata
+from ai_assist.session_cache import SessionCache, DEFAULT_SESSION_TTL
+from ai_assist.registry import ConnectionRegistry
+from ai_assist.retry import RetryPolicy
+from ai_assist.deploy_hashes import DeployHashStore
+from ai_assist.deployments import DeploymentManager
 from ai_assist.utils import (
     agent_requirements,
-    deploy_agent
+    agent_definition,
+    queue_agent_deployment
 )
+from ai_assist.validation import validate_agent, validation_report
 import logging
 
 
@@ -46,6 +54,33 @@ server.credentials = SalesforceCredentials(
     domain="login"
 )
 
+# Optional on-disk session cache shared between server processes
+session_cache_path = os.getenv("SALESFORCE_SESSION_CACHE")
+session_ttl = int(os.getenv("SALESFORCE_SESSION_TTL", DEFAULT_SESSION_TTL))
+session_cache = SessionCache(session_cache_path, ttl=session_ttl) if session_cache_path else None
+
+# Salesforce connections shared by all tool calls, one per org
+rate_limit = os.getenv("SALESFORCE_RATE_LIMIT")
+idle_ttl = os.getenv("SALESFORCE_CONNECTION_IDLE_TTL")
+server.connections = ConnectionRegistry(
+    max_size=int(os.getenv("SALESFORCE_MAX_CONNECTIONS", 100)),
+    idle_ttl=float(idle_ttl) if idle_ttl else None,
+    session_cache=session_cache,
+    session_ttl=session_ttl,
+    rate_limit=float(rate_limit) if rate_limit else None,
+    retry_policy=RetryPolicy(max_attempts=int(os.getenv("SALESFORCE_MAX_ATTEMPTS", 3)))
+)
+
+# Optional record of deployed agent hashes, used to skip unchanged agents
+deploy_hashes_path = os.getenv("AGENT_DEPLOY_HASHES")
+server.deploy_hashes = DeployHashStore(deploy_hashes_path) if deploy_hashes_path else None
+
+# Deployment queue, deployments to the same org run one at a time
+server.deployment_manager = DeploymentManager(max_workers=int(os.getenv("AGENT_DEPLOY_WORKERS", 4)))
+
+# Optional callable receiving the agent name, status and phase timings of every deployment
+server.deploy_metrics_hook = None
+
 
 @server.tool()
 def get_agent_requirements(requirements: List[str], conversation_id: str):
@@ -255,7 +290,63 @@ generate_agent_metadata.inputSchema = {
 
 
 @server.tool()
-def deploy_agent_tool(agent_metadata: dict):
+def validate_agent_metadata(agent_metadata: dict):
+        """
+        Check generated agent metadata for problems that would make its deployment fail, without deploying it.
+
+        Checks developer names of the agent, topics and actions, duplicate topic and action names,
+        and unsupported input and output data types. All problems are returned at once.
+        Errors make the deployment fail; fix them with the user before calling deploy_agent_tool.
+        Warnings are names that may not be accepted as developer names; mention them to the user.
+
+        Args:
+            agent_metadata: The agent metadata to validate as a dictionary
+        Returns:
+            dict: Whether the agent is valid and the lists of errors and warnings found
+        """
+        try:
+            metadata_obj = AgentMetadata.model_validate(agent_metadata)
+        except Exception as e:
+            raise ValueError(f"Invalid agent_metadata: {e}")
+        return validation_report(validate_agent(agent_definition(metadata_obj)))
+
+validate_agent_metadata.inputSchema = {
+    "type": "object",
+    "properties": {
+        "agent_metadata": AgentMetadata.model_json_schema(),
+    },
+    "required": ["agent_metadata"],
+}
+
+
+@server.tool()
+def validate_agent_file(json_file: str, dependent_metadata_dir: Optional[str] = None):
+        """
+        Check an agent JSON file for problems that would make its deployment fail, without deploying it.
+
+        The file is a single-file agent definition in the agent JSON schema of the SDK, with variables, attribute mappings and
+        invocation targets. On top of the checks of validate_agent_metadata, variable data types and
+        attribute mappings are checked, and when dependent_metadata_dir is given, that it contains a
+        package.xml and the Apex classes used as invocation targets. All problems are returned at once.
+
+        Args:
+            json_file: Path of the agent JSON file
+            dependent_metadata_dir: Optional directory of metadata the agent depends on
+        Returns:
+            dict: Whether the agent is valid and the lists of errors and warnings found
+        """
+        try:
+            with open(os.path.expanduser(json_file), "r") as f:
+                agent = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Could not read agent file {json_file}: {e}")
+        if any(not isinstance(topic, dict) for topic in agent.get("topics") or []):
+            raise ValueError(f"Agent file {json_file} references topic files, pass a single-file agent definition")
+        return validation_report(validate_agent(agent, dependent_metadata_dir))
+
+
+@server.tool()
+async def deploy_agent_tool(agent_metadata: dict, force: bool = False):
         """
         Deploy a previously generated agent to Salesforce.
         
@@ -267,34 +358,134 @@ def deploy_agent_tool(agent_metadata: dict):
         If there is no deployment result, return "Deployment failed"
         If the deployment Status is None, also return "Deployment failed", but keep the login URL so user can inspect the deployment logs
         In the deployment result, include the login URL of the Salesforce instance so the user can login to the agent.
+        If the deployment failed, component_failures lists each component that failed with its error; show them to the user.
+        timings lists the seconds spent in each phase of the deployment; use it to explain slow deployments.
+        
+        The agent is validated before deploying. If problems are found, the deployment result status is
+        "ValidationFailed" and lists the errors; fix them and deploy again. Warnings do not stop the deployment.
+        If the agent did not change since its last successful deployment, the deployment is skipped
+        and the deployment result status is "Skipped". Set force to redeploy it anyway.
         
         Args:   
             agent_metadata: The agent metadata to deploy as a dictionary
+            force: Deploy even if the agent did not change since its last deployment
         Returns:
             dict: The deployment status from Salesforce
         """
         try:
             # Convert dict to AgentMetadata object by validating against schema
             metadata_obj = AgentMetadata.model_validate(agent_metadata)
-            result = deploy_agent(metadata_obj, server)
-            
-            # Update deployment state
-            server.deployments[metadata_obj.agent_name] = result
-            
-            # Return the deployment status
-            return result
         except Exception as e:
             raise ValueError(f"Invalid agent_metadata: {e}")
 
+        # Wait in the org's deployment queue so other sessions are served while it runs. The
+        # deployment may be shared with coalesced start_agent_deployment calls, so a canceled
+        # tool call only stops waiting and leaves the deployment running.
+        handle = queue_agent_deployment(metadata_obj, server, force)
+        try:
+            return await handle.wait_async()
+        except asyncio.CancelledError:
+            if handle.status() != handle.CANCELED:
+                # The tool call itself was canceled
+                raise
+            raise ValueError(f"Deployment {handle.deployment_id} of agent {metadata_obj.agent_name} was canceled")
+
 deploy_agent_tool.inputSchema = {
     "type": "object",
     "properties": {
         "agent_metadata": AgentMetadata.model_json_schema(),
+        "force": {"type": "boolean", "default": False},
+    },
+    "required": ["agent_metadata"],
+}
+
+
+@server.tool()
+def start_agent_deployment(agent_metadata: dict, force: bool = False, priority: int = 0):
+        """
+        Start deploying a previously generated agent to Salesforce in the background and return immediately.
+
+        # Rules:
+        - The agent must be generated by the generate_agent_metadata tool
+        - Always ask the user first if they want to deploy the agent to their Salesforce org first
+        - Use get_deployment_status with the returned deployment_id to follow the deployment
+
+        Deployments to the same org run one at a time, highest priority first. Starting a deployment
+        of an agent that is still queued replaces the queued deployment with the newer definition.
+
+        Args:
+            agent_metadata: The agent metadata to deploy as a dictionary
+            force: Deploy even if the agent did not change since its last deployment
+            priority: Deployments with a higher priority run first
+        Returns:
+            dict: The deployment id and its initial status
+        """
+        try:
+            metadata_obj = AgentMetadata.model_validate(agent_metadata)
+        except Exception as e:
+            raise ValueError(f"Invalid agent_metadata: {e}")
+
+        handle = queue_agent_deployment(metadata_obj, server, force, priority)
+        return handle.to_dict()
+
+start_agent_deployment.inputSchema = {
+    "type": "object",
+    "properties": {
+        "agent_metadata": AgentMetadata.model_json_schema(),
+        "force": {"type": "boolean", "default": False},
+        "priority": {"type": "integer", "default": 0},
     },
     "required": ["agent_metadata"],
 }
 
 
+@server.tool()
+def get_deployment_status(deployment_id: str):
+        """
+        Get the status of a deployment started with start_agent_deployment.
+
+        The status is Queued or InProgress until the deployment finishes. Once finished, the result
+        includes the deployment result and the login URL of the Salesforce instance.
+
+        Args:
+            deployment_id: The id returned by start_agent_deployment
+        Returns:
+            dict: The deployment status
+        """
+        handle = server.deployment_manager.get(deployment_id)
+        if handle is None:
+            raise ValueError(f"Unknown deployment_id: {deployment_id}")
+        return handle.to_dict()
+
+
+@server.tool()
+def cancel_deployment(deployment_id: str):
+        """
+        Cancel a deployment started with start_agent_deployment that has not started yet.
+
+        Deployments already submitted to Salesforce cannot be canceled.
+
+        Args:
+            deployment_id: The id returned by start_agent_deployment
+        Returns:
+            dict: Whether the deployment was canceled and its status
+        """
+        handle = server.deployment_manager.get(deployment_id)
+        if handle is None:
+            raise ValueError(f"Unknown deployment_id: {deployment_id}")
+        canceled = handle.cancel()
+        return {"canceled": canceled, **handle.to_dict()}
+
+
+@server.resource("metrics://salesforce")
+def salesforce_metrics() -> str:
+    """Salesforce connection, session and deployment queue metrics of the server."""
+    return json.dumps({
+        "connections": server.connections.metrics(),
+        "deployments": server.deployment_manager.metrics(),
+    })
+
+
 @click.command()
 @click.option("--port", default=8000, help="Port to listen on for SSE")
 @click.option(
@@ -303,10 +494,27 @@ deploy_agent_tool.inputSchema = {
     default="stdio",
     help="Transport type",
 )
-def main(port=8000, transport="stdio"):
+@click.option(
+    "--session-renewal/--no-session-renewal",
+    default=False,
+    help="Renew the Salesforce session in the background before it expires",
+)
+@click.option("--session-renewal-margin", default=300, help="Seconds before expiry at which the session is renewed")
+@click.option(
+    "--warmup/--no-warmup",
+    default=False,
+    help="Log in to Salesforce at startup instead of on the first deployment",
+)
+def main(port=8000, transport="stdio", session_renewal=False, session_renewal_margin=300, warmup=False):
     # Update server settings if using SSE transport
     if transport == "sse":
         server.settings.port = port
+
+    if warmup:
+        server.connections.get(server.credentials).connect()
+
+    if session_renewal:
+        server.connections.start_renewal(margin=session_renewal_margin)
     
     # Run the server with the specified transport
     server.run(transport=transport)
@@ -0,0 +1,92 @@
+import time
+from typing import Optional
+
+from ai_assist.file_store import LockedJsonFile
+from ai_assist.models import CachedSession
+
+# Salesforce's default session timeout is two hours
+DEFAULT_SESSION_TTL = 2 * 60 * 60
+
+
+class SessionCache:
+    """
+    File-locked on-disk cache of Salesforce sessions.
+
+    Sessions are keyed by (username or consumer key, domain, auth flow) and reused
+    across processes until they expire or are rejected by Salesforce.
+    """
+
+    def __init__(self, path: str, ttl: int = DEFAULT_SESSION_TTL):
+        """
+        Initialize the cache.
+
+        Args:
+            path: Path of the JSON file used to store sessions
+            ttl: Number of seconds a cached session is considered valid
+        """
+        self.store = LockedJsonFile(path)
+        self.ttl = ttl
+
+    @staticmethod
+    def key(principal: str, domain: str, flow: str) -> str:
+        """Build the cache key for a login principal, domain and auth flow."""
+        return f"{flow}:{domain}:{principal}"
+
+    def get(self, key: str) -> Optional[CachedSession]:
+        """
+        Return the cached session for a key if it has not expired.
+
+        Args:
+            key: The cache key built with `SessionCache.key`
+        Returns:
+            The cached session, or None if there is no valid entry
+        """
+        with self.store.locked():
+            entry = self.store.read().get(key)
+        if not entry:
+            return None
+        session = CachedSession.model_validate(entry)
+        if session.expires_at <= time.time():
+            return None
+        return session
+
+    def put(self, key: str, instance_url: str, session_id: str) -> CachedSession:
+        """
+        Store a freshly issued session.
+
+        Args:
+            key: The cache key built with `SessionCache.key`
+            instance_url: The Salesforce instance URL of the session
+            session_id: The session id / access token
+        Returns:
+            The cached session
+        """
+        session = CachedSession(
+            instance_url=instance_url,
+            session_id=session_id,
+            expires_at=time.time() + self.ttl,
+        )
+        with self.store.locked():
+            entries = self.store.read()
+            entries[key] = session.model_dump()
+            self.store.write(entries)
+        return session
+
+    def invalidate(self, key: str, session_id: Optional[str] = None) -> None:
+        """
+        Drop a cached session.
+
+        Args:
+            key: The cache key built with `SessionCache.key`
+            session_id: Only drop the entry if it still holds this session id, so a
+                session refreshed by another process is kept
+        """
+        with self.store.locked():
+            entries = self.store.read()
+            entry = entries.get(key)
+            if entry is None:
+                return
+            if session_id is not None and entry.get("session_id") != session_id:
+                return
+            del entries[key]
+            self.store.write(entries)
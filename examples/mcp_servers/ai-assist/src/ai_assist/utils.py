@@ -1,11 +1,16 @@
+import contextlib
 import os
 import sys
+import time
+from datetime import datetime
 
 from agent_sdk.models.agent import Agent
-from agent_sdk.core.agentforce import Agentforce
-from agent_sdk.core.auth import BasicAuth
-from typing import List, Dict, Any
-from ai_assist.models import SalesforceCredentials, DeploymentState, AgentMetadata
+from typing import List, Dict, Any, Iterator, Optional
+from ai_assist.models import SalesforceCredentials, DeploymentState, AgentMetadata, ComponentFailure
+from ai_assist.deploy_hashes import agent_hash, deployment_succeeded
+from ai_assist.deployments import DeploymentHandle
+from ai_assist.session_cache import SessionCache
+from ai_assist.validation import WARNING, errors, validate_agent, validation_report
 from agent_sdk.models.topic import Topic
 from agent_sdk.models.action import Action, Input, Output
 import logging
@@ -33,48 +38,264 @@ def agent_requirements(requirements: List[str], conversation_id: str, server: An
 
 
 
-def deploy_agent(agent: AgentMetadata, server: Any) -> DeploymentState:
+def login_url(agent_force: Any) -> str:
+    """Create a login URL to the Agentforce setup page using Salesforce frontdoor.jsp."""
+    return f"https://{agent_force.instance_url}/secur/frontdoor.jsp?sid={agent_force.session_id}&retURL=/lightning/setup/EinsteinCopilot/home"
+
+
+def component_failures(result: Any) -> List[ComponentFailure]:
+    """Return the components reported as failed in an Agentforce.create result."""
+    if not isinstance(result, dict):
+        return []
+    details = (result.get("deployResult") or {}).get("details") or {}
+    failures = details.get("componentFailures") or []
+    # The Metadata API returns a single failure as an object instead of a list
+    if isinstance(failures, dict):
+        failures = [failures]
+    return [
+        ComponentFailure(
+            component_type=failure.get("componentType"),
+            full_name=failure.get("fullName"),
+            problem=failure.get("problem"),
+            problem_type=failure.get("problemType"),
+            file_name=failure.get("fileName"),
+            line_number=_line_number(failure.get("lineNumber"))
+        )
+        for failure in failures
+    ]
+
+
+def _line_number(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+@contextlib.contextmanager
+def timed(timings: Dict[str, float], phase: str) -> Iterator[None]:
+    """Record the seconds spent in the block under `phase`."""
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        timings[phase] = round(time.monotonic() - started, 3)
+
+
+def _parse_date(value: Any) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def org_timings(result: Any) -> Dict[str, float]:
+    """
+    Return the time a deployment spent queued and running in the org.
+
+    The phases are derived from the createdDate, startDate and completedDate of the
+    Metadata API deploy result, and left out when the result does not include them.
+    """
+    if not isinstance(result, dict):
+        return {}
+    deploy_result = result.get("deployResult") or {}
+    created, started, completed = (
+        _parse_date(deploy_result[key]) if deploy_result.get(key) else None
+        for key in ("createdDate", "startDate", "completedDate")
+    )
+    timings = {}
+    if created and started:
+        timings["org_queued"] = round((started - created).total_seconds(), 3)
+    if started and completed:
+        timings["org_deploy"] = round((completed - started).total_seconds(), 3)
+    return timings
+
+
+def emit_deploy_metrics(server: Any, agent_name: str, result: Any, timings: Dict[str, float]) -> None:
+    """
+    Log the phase timings of a deployment and pass them to the server metrics hook, if any.
+
+    Args:
+        server: The server, whose optional `deploy_metrics_hook` receives the metrics
+        agent_name: Name of the deployed agent
+        result: The deployment result, or the error message of a deployment that raised
+        timings: Seconds spent in each phase of the deployment
+    """
+    metrics: Dict[str, Any] = {"agent_name": agent_name, "status": "Failed", "timings": dict(timings)}
+    if isinstance(result, dict):
+        metrics["status"] = (result.get("deployResult") or {}).get("status") or result.get("status")
+    else:
+        metrics["error"] = str(result)
+    logger.info(f"Deployment of agent {agent_name} finished with status {metrics['status']}, timings {timings}")
+    hook = getattr(server, "deploy_metrics_hook", None)
+    if hook is None:
+        return
+    try:
+        hook(metrics)
+    except Exception as e:
+        logger.warning(f"Deploy metrics hook failed: {e}")
+
+
+def agent_definition(agent: AgentMetadata) -> Dict:
+    """Return the agent metadata in the format of the agent JSON schema."""
+    return {"name": agent.agent_name, **agent.model_dump(exclude={"agent_name"})}
+
+
+def deploy_agent(
+    agent: AgentMetadata,
+    server: Any,
+    force: bool = False,
+    queue_wait: Optional[float] = None,
+    credentials: Optional[SalesforceCredentials] = None
+) -> DeploymentState:
     """
     Deploy a previously generated agent to Salesforce.
+
+    The agent is validated locally first and not deployed if problems are found. When a
+    deploy hash store is configured on the server, agents whose content did not change since
+    their last successful deployment to the org are skipped unless `force` is set.
+
+    The seconds spent in each phase are returned in the `timings` of the deployment state
+    and passed to the `deploy_metrics_hook` of the server, if set, also when the deployment
+    raises. `queue_wait` is the time the deployment waited in the org's deployment queue.
+
+    The agent is deployed to the org of `credentials`, by default the server credentials.
     """
+    timings: Dict[str, float] = {}
+    if queue_wait is not None:
+        timings["queue_wait"] = round(queue_wait, 3)
+    new_agent = None
     try:
         
-        new_agent = Agent(
-            name=agent.agent_name,
-            description=agent.description,
-            agent_type="External",
-            company_name=agent.company_name
-        )
+        with timed(timings, "build"):
+            new_agent = Agent(
+                name=agent.agent_name,
+                description=agent.description,
+                agent_type="External",
+                company_name=agent.company_name
+            )
+
+            new_agent.sample_utterances = agent.sample_utterances
+            new_agent.system_messages = agent.system_messages
+
 
-        new_agent.sample_utterances = agent.sample_utterances
-        new_agent.system_messages = agent.system_messages
+            new_topics = []
+            for topic in agent.topics:
+                new_topics.append(Topic.model_validate(topic.model_dump()))
 
+            new_agent.topics = new_topics
 
-        new_topics = []
-        for topic in agent.topics:
-            new_topics.append(Topic.model_validate(topic.model_dump()))
+        with timed(timings, "validate"):
+            issues = validate_agent(agent_definition(agent))
+        for issue in issues:
+            if issue.severity == WARNING:
+                logger.warning(f"Agent {agent.agent_name} {issue.path}: {issue.message}")
+        if errors(issues):
+            logger.info(f"Agent {agent.agent_name} failed validation with {len(errors(issues))} errors, not deploying")
+            report = validation_report(issues)
+            deployment_result = DeploymentState(
+                agent=new_agent,
+                deployment_result={"status": "ValidationFailed", "errors": report["errors"], "warnings": report["warnings"]},
+                timings=timings
+            )
+            emit_deploy_metrics(server, agent.agent_name, deployment_result.deployment_result, timings)
+            return deployment_result
 
-        new_agent.topics = new_topics
-        basic_auth = BasicAuth(username=server.credentials.username, password=server.credentials.password, domain=server.credentials.domain)
-        # Initialize AgentForce client
-        agent_force = Agentforce(auth=basic_auth)
-        # Create a login URL using Salesforce frontdoor.jsp
-        login_url = f"https://{agent_force.instance_url}/secur/frontdoor.jsp?sid={agent_force.session_id}&retURL=/lightning/setup/EinsteinCopilot/home"
-    
-        status = agent_force.create(new_agent)
+        connection = server.connections.get(credentials or server.credentials)
+        deploy_hashes = getattr(server, "deploy_hashes", None)
+        with timed(timings, "hash"):
+            digest = agent_hash(new_agent)
+            unchanged = (
+                deploy_hashes is not None
+                and not force
+                and deploy_hashes.get(connection.cache_key, new_agent.name) == digest
+            )
+        if unchanged:
+            logger.info(f"Agent {new_agent.name} is unchanged since its last deployment, skipping")
+            # Skipping must not cost a login, only link to the org when already logged in
+            client = connection.current_client
+            deployment_result = DeploymentState(
+                agent=new_agent,
+                deployment_result={"status": "Skipped", "reason": "Agent is unchanged since its last successful deployment"},
+                login_url=login_url(client) if client is not None else None,
+                timings=timings
+            )
+            emit_deploy_metrics(server, agent.agent_name, deployment_result.deployment_result, timings)
+            return deployment_result
+
+        with timed(timings, "login"):
+            connection.client()
+
+        def create(agent_force):
+            return agent_force, agent_force.create(new_agent)
+
+        # Deploy with the shared AgentForce client, logging in again if the session expired. A
+        # deployment is not idempotent: only retry when the connection could not even be made,
+        # so an error while polling the deploy status never submits the deployment again.
+        with timed(timings, "deploy"):
+            # create() returns None instead of raising when the session was rejected
+            agent_force, status = connection.call(
+                create,
+                endpoint="deploy",
+                idempotent=False,
+                stale=lambda result: result[1] is None
+            )
+        timings.update(org_timings(status))
         deployment_result = DeploymentState(
             agent=new_agent,
             deployment_result=status,
-            login_url=login_url     
+            login_url=login_url(agent_force),
+            component_failures=component_failures(status),
+            timings=timings
         )
+        # Only record the hash once the result was fully read
+        if deploy_hashes is not None and deployment_succeeded(status):
+            deploy_hashes.record(connection.cache_key, new_agent.name, digest)
+        emit_deploy_metrics(server, agent.agent_name, deployment_result.deployment_result, timings)
         # Update deployment state
         server.deployments[agent.agent_name] = deployment_result
         return deployment_result
     except Exception as e:
         logger.error(f"Error in the deploy_agent function: {e}")
+        emit_deploy_metrics(server, agent.agent_name, str(e), timings)
+        if new_agent is None:
+            # The agent could not even be built, there is no deployment state to report
+            raise
         return DeploymentState(
-            agent=agent,
-            deployment_result=str(e)
+            agent=new_agent,
+            deployment_result=str(e),
+            timings=timings
         )
 
-  
\ No newline at end of file
+
+def queue_agent_deployment(
+    agent: AgentMetadata,
+    server: Any,
+    force: bool = False,
+    priority: int = 0,
+    credentials: Optional[SalesforceCredentials] = None
+) -> DeploymentHandle:
+    """
+    Queue the deployment of an agent in the server's per-org deployment queue.
+
+    Deployments to the same org run one at a time, see `DeploymentManager`.
+
+    Args:
+        agent: The agent to deploy
+        server: The server holding the deployment queue and Salesforce connections
+        force: Deploy even if the agent did not change since its last deployment
+        priority: Deployments with a higher priority run first within an org
+        credentials: Credentials of the org to deploy to, by default the server credentials
+    Returns:
+        The handle of the deployment
+    """
+    credentials = credentials or server.credentials
+
+    def deploy(queue_wait: float) -> DeploymentState:
+        result = deploy_agent(agent, server, force, queue_wait=queue_wait, credentials=credentials)
+        server.deployments[agent.agent_name] = result
+        return result
+
+    # The key of the connection registry, computed without creating a connection
+    org = SessionCache.key(credentials.username, credentials.domain, "basic")
+    return server.deployment_manager.start(agent.agent_name, deploy, org=org, priority=priority)
@@ -0,0 +1,189 @@
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from ai_assist.models import ValidationIssue
+
+# Data types accepted by the agent definition schema (docs/schemas/input_json_schema.json)
+INPUT_DATA_TYPES = {"string", "number", "boolean", "object", "array", "date", "time"}
+OUTPUT_DATA_TYPES = {"string", "number", "boolean", "object", "array"}
+# Variable data types by lower-cased name, the SDK also accepts "string" for Text
+VARIABLE_DATA_TYPES = {"text": "Text", "string": "Text", "boolean": "Boolean"}
+
+MAX_DEVELOPER_NAME_LENGTH = 80
+
+_DEVELOPER_NAME = re.compile(r"^[A-Za-z][A-Za-z0-9_]*$")
+
+
+ERROR = "error"
+WARNING = "warning"
+
+
+def developer_name(name: str) -> str:
+    """Return the developer name a display name is deployed under, spaces become underscores."""
+    return re.sub(r"\s+", "_", name.strip())
+
+
+def errors(issues: List[ValidationIssue]) -> List[ValidationIssue]:
+    """Return the issues that make a deployment fail, leaving out warnings."""
+    return [issue for issue in issues if issue.severity == ERROR]
+
+
+def validation_report(issues: List[ValidationIssue]) -> Dict[str, Any]:
+    """Return validation issues as a JSON-serializable report of errors and warnings."""
+    return {
+        "valid": not errors(issues),
+        "errors": [issue.model_dump() for issue in issues if issue.severity == ERROR],
+        "warnings": [issue.model_dump() for issue in issues if issue.severity == WARNING],
+    }
+
+
+def _check_name(issues: List[ValidationIssue], name: Optional[str], path: str) -> None:
+    if not name:
+        issues.append(ValidationIssue(code="missing_name", path=path, message="Name is required"))
+        return
+    dev_name = developer_name(name)
+    problem = None
+    if not _DEVELOPER_NAME.match(dev_name):
+        problem = "must start with a letter and contain only ASCII letters, digits, spaces and underscores"
+    elif "__" in dev_name:
+        problem = "must not contain consecutive underscores"
+    elif dev_name.endswith("_"):
+        problem = "must not end with an underscore"
+    elif len(dev_name) > MAX_DEVELOPER_NAME_LENGTH:
+        problem = f"must not be longer than {MAX_DEVELOPER_NAME_LENGTH} characters"
+    if problem:
+        # The SDK may sanitize display names into developer names, so this may still deploy
+        issues.append(ValidationIssue(
+            code="invalid_developer_name",
+            path=path,
+            message=f"'{name}' {problem} to be used as a developer name as is",
+            severity=WARNING
+        ))
+
+
+def _find_apex_class(dependent_metadata_dir: str, class_name: str) -> bool:
+    file_name = f"{class_name}.cls".lower()
+    for _, _, files in os.walk(dependent_metadata_dir):
+        if any(f.lower() == file_name for f in files):
+            return True
+    return False
+
+
+def validate_agent(agent: Dict[str, Any], dependent_metadata_dir: Optional[str] = None) -> List[ValidationIssue]:
+    """
+    Check an agent definition for problems that would make its deployment fail.
+
+    All rules run locally and every problem found is returned, so an agent can be fixed
+    in one pass instead of one failed deployment per problem. Problems certain to fail the
+    deployment are errors; names that may not be valid developer names are warnings.
+
+    Args:
+        agent: The agent definition, in the format of the agent JSON schema
+        dependent_metadata_dir: Optional directory of metadata the agent depends on
+    Returns:
+        The problems found, empty if the agent is valid
+    """
+    issues: List[ValidationIssue] = []
+    _check_name(issues, agent.get("name"), "name")
+
+    variables = agent.get("variables") or []
+    variable_names = set()
+    for i, variable in enumerate(variables):
+        path = f"variables[{i}]"
+        _check_name(issues, variable.get("name"), f"{path}.name")
+        variable_names.add(variable.get("name"))
+        if str(variable.get("data_type")).lower() not in VARIABLE_DATA_TYPES:
+            issues.append(ValidationIssue(
+                code="unsupported_data_type",
+                path=f"{path}.data_type",
+                message=f"Variable data type '{variable.get('data_type')}' is not one of {sorted(set(VARIABLE_DATA_TYPES.values()))}"
+            ))
+
+    if dependent_metadata_dir is not None:
+        if not os.path.isdir(dependent_metadata_dir):
+            issues.append(ValidationIssue(
+                code="missing_dependent_metadata_dir",
+                path="dependent_metadata_dir",
+                message=f"Directory '{dependent_metadata_dir}' does not exist"
+            ))
+            dependent_metadata_dir = None
+        elif not os.path.isfile(os.path.join(dependent_metadata_dir, "package.xml")):
+            issues.append(ValidationIssue(
+                code="missing_package_xml",
+                path="dependent_metadata_dir",
+                message=f"Directory '{dependent_metadata_dir}' does not contain a package.xml"
+            ))
+
+    topic_paths: Dict[str, str] = {}
+    action_paths: Dict[str, str] = {}
+    for t, topic in enumerate(agent.get("topics") or []):
+        topic_path = f"topics[{t}]"
+        _check_name(issues, topic.get("name"), f"{topic_path}.name")
+        topic_key = developer_name(topic.get("name") or "").lower()
+        if topic_key in topic_paths:
+            issues.append(ValidationIssue(
+                code="duplicate_topic_name",
+                path=f"{topic_path}.name",
+                message=f"Topic '{topic.get('name')}' has the same name as {topic_paths[topic_key]}"
+            ))
+        else:
+            topic_paths[topic_key] = topic_path
+
+        for a, action in enumerate(topic.get("actions") or []):
+            action_path = f"{topic_path}.actions[{a}]"
+            _check_name(issues, action.get("name"), f"{action_path}.name")
+            action_key = developer_name(action.get("name") or "").lower()
+            if action_key in action_paths:
+                issues.append(ValidationIssue(
+                    code="duplicate_action_name",
+                    path=f"{action_path}.name",
+                    message=f"Action '{action.get('name')}' has the same name as {action_paths[action_key]}"
+                ))
+            else:
+                action_paths[action_key] = action_path
+
+            parameters = {"input": set(), "output": set()}
+            for direction, data_types in (("input", INPUT_DATA_TYPES), ("output", OUTPUT_DATA_TYPES)):
+                for p, parameter in enumerate(action.get(f"{direction}s") or []):
+                    parameter_path = f"{action_path}.{direction}s[{p}]"
+                    if parameter.get("name"):
+                        parameters[direction].add(parameter["name"])
+                    data_type = parameter.get("data_type")
+                    if data_type is not None and str(data_type).lower() not in data_types:
+                        issues.append(ValidationIssue(
+                            code="unsupported_data_type",
+                            path=f"{parameter_path}.data_type",
+                            message=f"The {direction} data type '{data_type}' is not supported"
+                        ))
+
+            for m, mapping in enumerate(action.get("attribute_mappings") or []):
+                mapping_path = f"{action_path}.attribute_mappings[{m}]"
+                if mapping.get("variable_name") not in variable_names:
+                    issues.append(ValidationIssue(
+                        code="dangling_attribute_mapping",
+                        path=f"{mapping_path}.variable_name",
+                        message=f"Variable '{mapping.get('variable_name')}' is not defined on the agent"
+                    ))
+                direction = mapping.get("direction")
+                if direction in parameters and mapping.get("action_parameter") not in parameters[direction]:
+                    issues.append(ValidationIssue(
+                        code="dangling_attribute_mapping",
+                        path=f"{mapping_path}.action_parameter",
+                        message=f"Action has no {direction} named '{mapping.get('action_parameter')}'"
+                    ))
+
+            target = action.get("invocation_target")
+            if (
+                dependent_metadata_dir is not None
+                and target
+                and str(action.get("invocation_target_type", "")).lower() == "apex"
+                and not _find_apex_class(dependent_metadata_dir, target)
+            ):
+                issues.append(ValidationIssue(
+                    code="missing_invocation_target",
+                    path=f"{action_path}.invocation_target",
+                    message=f"Apex class '{target}' was not found in '{dependent_metadata_dir}'"
+                ))
+
+    return issues
@@ -0,0 +1,6 @@
+import os
+
+# Importing ai_assist loads the server module, which requires Salesforce credentials.
+# Tests never log in, so any value will do.
+os.environ.setdefault("SALESFORCE_USERNAME", "test@example.com")
+os.environ.setdefault("SALESFORCE_PASSWORD", "test")
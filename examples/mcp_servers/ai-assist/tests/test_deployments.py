@@ -0,0 +1,208 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+from ai_assist.deployments import DeploymentHandle, DeploymentManager
+
+
+@pytest.fixture
+def manager():
+    manager = DeploymentManager(max_workers=2)
+    yield manager
+    manager.shutdown(wait=False)
+
+
+def blocker():
+    """Return a deploy callable that runs until the returned event is set."""
+    release = threading.Event()
+    started = threading.Event()
+
+    def deploy(queue_wait):
+        started.set()
+        assert release.wait(5)
+        return "blocker"
+
+    return deploy, started, release
+
+
+def test_wait_returns_deploy_result(manager):
+    handle = manager.start("Agent", lambda queue_wait: "result")
+
+    assert handle.wait(5) == "result"
+    assert handle.done()
+    assert manager.get(handle.deployment_id) is handle
+
+
+def test_wait_raises_deploy_error(manager):
+    def deploy(queue_wait):
+        raise RuntimeError("boom")
+
+    handle = manager.start("Agent", deploy)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        handle.wait(5)
+    assert handle.status() == DeploymentHandle.FAILED
+    assert handle.to_dict()["error"] == "boom"
+
+
+def test_status_while_queued_and_running(manager):
+    deploy, started, release = blocker()
+    running = manager.start("Running", deploy)
+    assert started.wait(5)
+    queued = manager.start("Queued", lambda queue_wait: "queued")
+
+    assert running.status() == DeploymentHandle.IN_PROGRESS
+    assert queued.status() == DeploymentHandle.QUEUED
+
+    release.set()
+    assert queued.wait(5) == "queued"
+
+
+def test_cancel_queued_deployment(manager):
+    deploy, started, release = blocker()
+    running = manager.start("Running", deploy)
+    assert started.wait(5)
+    calls = []
+    queued = manager.start("Queued", lambda queue_wait: calls.append(queue_wait))
+
+    assert queued.cancel()
+    assert not running.cancel()
+    release.set()
+
+    assert running.wait(5) == "blocker"
+    assert queued.status() == DeploymentHandle.CANCELED
+    with pytest.raises(concurrent.futures.CancelledError):
+        queued.wait(5)
+    assert calls == []
+
+
+def test_wait_async_timeout_leaves_deployment_running(manager):
+    deploy, started, release = blocker()
+    handle = manager.start("Agent", deploy)
+    assert started.wait(5)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(handle.wait_async(timeout=0.01))
+
+    assert not handle.done()
+    release.set()
+    assert handle.wait(5) == "blocker"
+
+
+def test_runs_highest_priority_first(manager):
+    deploy, started, release = blocker()
+    manager.start("Blocker", deploy)
+    assert started.wait(5)
+    order = []
+    handles = [
+        manager.start(name, lambda queue_wait, name=name: order.append(name), priority=priority)
+        for name, priority in (("Low", 0), ("High", 5), ("Medium", 1), ("AlsoLow", 0))
+    ]
+
+    release.set()
+    for handle in handles:
+        handle.wait(5)
+    assert order == ["High", "Medium", "Low", "AlsoLow"]
+
+
+def test_orgs_deploy_in_parallel(manager):
+    deploy, started, release = blocker()
+    manager.start("Agent", deploy, org="org1")
+    assert started.wait(5)
+
+    assert manager.start("Agent", lambda queue_wait: "org2", org="org2").wait(5) == "org2"
+    release.set()
+
+
+def test_coalesces_queued_deployments_of_the_same_agent(manager):
+    deploy, started, release = blocker()
+    manager.start("Blocker", deploy)
+    assert started.wait(5)
+    calls = []
+    first = manager.start("Agent", lambda queue_wait: calls.append("first") or "first")
+    second = manager.start("Agent", lambda queue_wait: calls.append("second") or "second")
+    other_org = manager.start("Agent", lambda queue_wait: "other", org="other")
+
+    assert manager.metrics()["coalesced"] == 1
+    assert manager.metrics()["orgs"]["default"]["queued"] == 1
+    release.set()
+
+    assert first.wait(5) == second.wait(5) == "second"
+    assert calls == ["second"]
+    assert other_org.wait(5) == "other"
+    assert first.deployment_id != second.deployment_id
+
+
+def test_coalescing_raises_priority(manager):
+    deploy, started, release = blocker()
+    manager.start("Blocker", deploy)
+    assert started.wait(5)
+    order = []
+    manager.start("Agent", lambda queue_wait: order.append("Agent"))
+    manager.start("Other", lambda queue_wait: order.append("Other"), priority=1)
+    handle = manager.start("Agent", lambda queue_wait: order.append("Agent"), priority=2)
+
+    release.set()
+    handle.wait(5)
+    manager.shutdown(wait=True)
+    assert order == ["Agent", "Other"]
+
+
+def test_coalesced_queue_wait_counts_from_first_request(manager):
+    deploy, started, release = blocker()
+    manager.start("Blocker", deploy)
+    assert started.wait(5)
+    manager.start("Agent", lambda queue_wait: queue_wait)
+    time.sleep(0.05)
+    handle = manager.start("Agent", lambda queue_wait: queue_wait)
+
+    release.set()
+    assert handle.wait(5) >= 0.05
+
+
+def test_cancel_one_coalesced_handle(manager):
+    deploy, started, release = blocker()
+    manager.start("Blocker", deploy)
+    assert started.wait(5)
+    first = manager.start("Agent", lambda queue_wait: "first")
+    second = manager.start("Agent", lambda queue_wait: "second")
+
+    assert first.cancel()
+    release.set()
+
+    assert second.wait(5) == "second"
+    assert first.status() == DeploymentHandle.CANCELED
+
+
+def test_skips_deployment_when_every_handle_is_canceled(manager):
+    deploy, started, release = blocker()
+    manager.start("Blocker", deploy)
+    assert started.wait(5)
+    calls = []
+    first = manager.start("Agent", lambda queue_wait: calls.append("first"))
+    second = manager.start("Agent", lambda queue_wait: calls.append("second"))
+
+    assert first.cancel() and second.cancel()
+    assert manager.metrics()["orgs"]["default"]["queued"] == 0
+    release.set()
+    manager.shutdown(wait=True)
+
+    assert calls == []
+
+
+def test_does_not_coalesce_into_canceled_deployment(manager):
+    deploy, started, release = blocker()
+    manager.start("Blocker", deploy)
+    assert started.wait(5)
+    canceled = manager.start("Agent", lambda queue_wait: "canceled")
+    assert canceled.cancel()
+    handle = manager.start("Agent", lambda queue_wait: "new")
+
+    assert manager.metrics()["coalesced"] == 0
+    release.set()
+
+    assert handle.wait(5) == "new"
+    assert canceled.status() == DeploymentHandle.CANCELED
@@ -0,0 +1,151 @@
+from types import SimpleNamespace
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from ai_assist import rate_limit
+from ai_assist.rate_limit import RateLimiter, ThrottledAdapter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+@pytest.mark.parametrize("header, usage", [
+    ("api-usage=18/5000", (18, 5000)),
+    ("api-usage=4990/5000", (4990, 5000)),
+    ("per-app-api-usage=17/250(appName=sample-app), api-usage=18/5000", (18, 5000)),
+    ("api-usage=18/5000; per-app-api-usage=17/250(appName=sample-app)", (18, 5000)),
+])
+def test_update_from_header(header, usage):
+    limiter = RateLimiter()
+
+    limiter.update_from_header(header)
+
+    assert (limiter.api_used, limiter.api_total) == usage
+    assert limiter.remaining == usage[1] - usage[0]
+
+
+@pytest.mark.parametrize("header", [None, "", "per-app-api-usage=17/250(appName=sample-app)", "api-usage=unknown"])
+def test_update_from_header_ignores_missing_usage(header):
+    limiter = RateLimiter()
+
+    limiter.update_from_header(header)
+
+    assert limiter.remaining is None
+    assert limiter.current_rate == limiter.rate
+
+
+@pytest.mark.parametrize("used, factor", [
+    (0, 1.0),
+    (4000, 1.0),
+    (4250, 0.5),
+    (4500, 0.05),
+    (5000, 0.05),
+])
+def test_rate_slows_down_near_reserve(used, factor):
+    limiter = RateLimiter(rate=10, reserve=0.1, min_rate_factor=0.05)
+
+    limiter.update(used, 5000)
+
+    assert limiter.current_rate == pytest.approx(10 * factor)
+
+
+def test_acquire_allows_burst_then_waits(clock):
+    limiter = RateLimiter(rate=10, burst=2)
+
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == pytest.approx(0.1)
+    assert clock.sleeps == [pytest.approx(0.1)]
+    assert limiter.throttled_count == 1
+
+    clock.now += 1
+    assert limiter.acquire() == 0
+
+
+def test_acquire_waits_longer_when_budget_is_low(clock):
+    limiter = RateLimiter(rate=10, burst=1)
+    limiter.update(4500, 5000)
+
+    limiter.acquire()
+
+    assert limiter.acquire() == pytest.approx(2.0)
+
+
+class RecordingAdapter(BaseAdapter):
+    def __init__(self, header):
+        super().__init__()
+        self.header = header
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append(request)
+        response = requests.Response()
+        response.headers["Sforce-Limit-Info"] = self.header
+        return response
+
+    def close(self):
+        pass
+
+
+def test_instrument_throttles_client_session(clock):
+    limiter = RateLimiter(rate=10, burst=1)
+    adapter = RecordingAdapter("api-usage=25/5000")
+    session = requests.Session()
+    session.adapters.clear()
+    session.mount("https://", adapter)
+    client = SimpleNamespace(sf=SimpleNamespace(session=session))
+
+    assert limiter.instrument(client)
+    assert limiter.instrument(client)
+    assert isinstance(session.adapters["https://"], ThrottledAdapter)
+    assert session.adapters["https://"].adapter is adapter
+
+    session.get("https://example.my.salesforce.com/services/data")
+    session.get("https://example.my.salesforce.com/services/data")
+
+    assert len(adapter.sent) == 2
+    assert limiter.throttled_count == 1
+    assert limiter.api_used == 25
+
+
+def test_instrument_without_session():
+    assert not RateLimiter().instrument(SimpleNamespace())
+
+
+def test_poll_reads_limits():
+    limiter = RateLimiter()
+    client = SimpleNamespace(sf=SimpleNamespace(limits=lambda: {"DailyApiRequests": {"Max": 5000, "Remaining": 4000}}))
+
+    limiter.poll(client)
+
+    assert (limiter.api_used, limiter.api_total) == (1000, 5000)
+
+
+def test_poll_logs_errors():
+    def limits():
+        raise requests.ConnectionError("unreachable")
+
+    limiter = RateLimiter()
+
+    limiter.poll(SimpleNamespace(sf=SimpleNamespace(limits=limits)))
+
+    assert limiter.remaining is None
@@ -0,0 +1,144 @@
+import pytest
+import requests
+
+from ai_assist import retry
+from ai_assist.retry import CircuitBreaker, CircuitOpenError, RetryPolicy, is_transient
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(retry, "time", clock)
+    return clock
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened_count == 1
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 1
+
+
+def test_breaker_lets_one_trial_through_after_reset_timeout(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    open_breaker(breaker)
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now += 1
+    breaker.before_call()
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_successful_trial_closes_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    open_breaker(breaker)
+    clock.now += 30
+    breaker.before_call()
+
+    breaker.record_success()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 0
+    breaker.before_call()
+    breaker.before_call()
+
+
+def test_failed_trial_reopens_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    open_breaker(breaker)
+    clock.now += 30
+    breaker.before_call()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened_count == 2
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    clock.now += 30
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+class SalesforceError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+@pytest.mark.parametrize("error, transient", [
+    (requests.ConnectionError(), True),
+    (requests.ConnectTimeout(), True),
+    (requests.ReadTimeout(), True),
+    (SalesforceError("Server error", status=503), True),
+    (SalesforceError("UNABLE_TO_LOCK_ROW: unable to obtain exclusive access"), True),
+    (SalesforceError("Not found", status=404), False),
+    (SalesforceError("INVALID_FIELD: No such column"), False),
+    (ValueError("bad agent"), False),
+])
+def test_is_transient(error, transient):
+    assert is_transient(error) is transient
+
+
+def test_should_retry_stops_after_max_attempts_and_elapsed():
+    policy = RetryPolicy(max_attempts=3, max_elapsed=60)
+    error = requests.ConnectionError()
+
+    assert policy.should_retry(error, attempt=2, elapsed=0)
+    assert not policy.should_retry(error, attempt=3, elapsed=0)
+    assert not policy.should_retry(error, attempt=1, elapsed=60)
+    assert not policy.should_retry(ValueError(), attempt=1, elapsed=0)
+
+
+def test_non_idempotent_calls_only_retry_connect_timeouts():
+    policy = RetryPolicy()
+
+    assert policy.should_retry(requests.ConnectTimeout(), attempt=1, elapsed=0, idempotent=False)
+    assert not policy.should_retry(requests.ReadTimeout(), attempt=1, elapsed=0, idempotent=False)
+    assert not policy.should_retry(requests.ConnectionError(), attempt=1, elapsed=0, idempotent=False)
+    assert not policy.should_retry(SalesforceError("UNABLE_TO_LOCK_ROW"), attempt=1, elapsed=0, idempotent=False)
+
+
+def test_delay_is_capped():
+    policy = RetryPolicy(base_delay=1, max_delay=5)
+
+    assert all(0 <= policy.delay(1) <= 1 for _ in range(100))
+    assert all(0 <= policy.delay(10) <= 5 for _ in range(100))
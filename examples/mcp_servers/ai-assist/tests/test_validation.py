@@ -0,0 +1,207 @@
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+from ai_assist.validation import ERROR, WARNING, errors, validate_agent, validation_report
+
+ASSETS = Path(__file__).resolve().parents[3] / "assets"
+
+AGENT = {
+    "name": "Order Agent",
+    "variables": [{"name": "customer_id", "data_type": "Text"}],
+    "topics": [
+        {
+            "name": "Order Status",
+            "actions": [
+                {
+                    "name": "Get Order",
+                    "invocation_target": "OrderService",
+                    "invocation_target_type": "apex",
+                    "inputs": [{"name": "order_id", "data_type": "string"}],
+                    "outputs": [{"name": "status", "data_type": "string"}],
+                    "attribute_mappings": [
+                        {"action_parameter": "order_id", "variable_name": "customer_id", "direction": "input"},
+                    ],
+                },
+            ],
+        },
+    ],
+}
+
+
+@pytest.fixture
+def agent():
+    return copy.deepcopy(AGENT)
+
+
+@pytest.fixture
+def metadata_dir(tmp_path):
+    (tmp_path / "package.xml").write_text("<Package/>")
+    (tmp_path / "order" / "classes").mkdir(parents=True)
+    (tmp_path / "order" / "classes" / "OrderService.cls").write_text("public class OrderService {}")
+    return tmp_path
+
+
+def codes(issues, severity=ERROR):
+    return [(issue.code, issue.path) for issue in issues if issue.severity == severity]
+
+
+def test_valid_agent(agent, metadata_dir):
+    assert validate_agent(agent, str(metadata_dir)) == []
+
+
+@pytest.mark.parametrize("asset", ["input.json", "nested_agent_dir/order_management_agent.json"])
+def test_bundled_agents_are_valid(asset):
+    issues = validate_agent(json.loads((ASSETS / asset).read_text()))
+
+    assert errors(issues) == []
+
+
+def test_missing_name(agent):
+    del agent["name"]
+    agent["topics"][0]["actions"][0]["name"] = ""
+
+    assert codes(validate_agent(agent)) == [
+        ("missing_name", "name"),
+        ("missing_name", "topics[0].actions[0].name"),
+    ]
+
+
+@pytest.mark.parametrize("name", [
+    "Returns & Refunds",
+    "Acme's Helper",
+    "Café Bot",
+    "Order-Status",
+    "1st Line Support",
+    "Order__Status",
+    "Order_",
+    "A" * 81,
+])
+def test_invalid_developer_names_are_warnings(agent, name):
+    agent["topics"][0]["name"] = name
+
+    issues = validate_agent(agent)
+
+    assert codes(issues) == []
+    assert codes(issues, WARNING) == [("invalid_developer_name", "topics[0].name")]
+    report = validation_report(issues)
+    assert report["valid"]
+    assert report["errors"] == []
+    assert [warning["code"] for warning in report["warnings"]] == ["invalid_developer_name"]
+
+
+def test_valid_developer_names(agent):
+    agent["name"] = "Order Agent 2"
+    agent["topics"][0]["name"] = "order_status"
+    agent["topics"][0]["actions"][0]["name"] = "A" * 80
+
+    assert validate_agent(agent) == []
+
+
+def test_duplicate_topic_name(agent):
+    agent["topics"].append({"name": "order status", "actions": []})
+    agent["topics"].append({"name": "Order_Status", "actions": []})
+
+    assert codes(validate_agent(agent)) == [
+        ("duplicate_topic_name", "topics[1].name"),
+        ("duplicate_topic_name", "topics[2].name"),
+    ]
+
+
+def test_duplicate_action_name_across_topics(agent):
+    agent["topics"].append({"name": "Returns", "actions": [{"name": "Get  Order"}]})
+
+    assert codes(validate_agent(agent)) == [("duplicate_action_name", "topics[1].actions[0].name")]
+
+
+@pytest.mark.parametrize("direction, data_type", [("input", "currency"), ("output", "date"), ("output", "time")])
+def test_unsupported_parameter_data_type(agent, direction, data_type):
+    agent["topics"][0]["actions"][0][f"{direction}s"][0]["data_type"] = data_type
+
+    assert codes(validate_agent(agent)) == [
+        ("unsupported_data_type", f"topics[0].actions[0].{direction}s[0].data_type"),
+    ]
+
+
+@pytest.mark.parametrize("data_type", ["String", "NUMBER", "date", "time", "object", "array", "boolean"])
+def test_supported_input_data_types(agent, data_type):
+    agent["topics"][0]["actions"][0]["inputs"][0]["data_type"] = data_type
+
+    assert validate_agent(agent) == []
+
+
+@pytest.mark.parametrize("data_type", ["Text", "text", "string", "Boolean"])
+def test_supported_variable_data_types(agent, data_type):
+    agent["variables"][0]["data_type"] = data_type
+
+    assert validate_agent(agent) == []
+
+
+@pytest.mark.parametrize("data_type", ["Number", "Date", None])
+def test_unsupported_variable_data_type(agent, data_type):
+    agent["variables"][0]["data_type"] = data_type
+
+    assert codes(validate_agent(agent)) == [("unsupported_data_type", "variables[0].data_type")]
+
+
+def test_dangling_attribute_mappings(agent):
+    agent["topics"][0]["actions"][0]["attribute_mappings"] = [
+        {"action_parameter": "order_id", "variable_name": "unknown", "direction": "input"},
+        {"action_parameter": "missing", "variable_name": "customer_id", "direction": "input"},
+        {"action_parameter": "order_id", "variable_name": "customer_id", "direction": "output"},
+    ]
+
+    assert codes(validate_agent(agent)) == [
+        ("dangling_attribute_mapping", "topics[0].actions[0].attribute_mappings[0].variable_name"),
+        ("dangling_attribute_mapping", "topics[0].actions[0].attribute_mappings[1].action_parameter"),
+        ("dangling_attribute_mapping", "topics[0].actions[0].attribute_mappings[2].action_parameter"),
+    ]
+
+
+def test_missing_dependent_metadata_dir(agent, tmp_path):
+    assert codes(validate_agent(agent, str(tmp_path / "missing"))) == [
+        ("missing_dependent_metadata_dir", "dependent_metadata_dir"),
+    ]
+
+
+def test_missing_package_xml(agent, metadata_dir):
+    (metadata_dir / "package.xml").unlink()
+
+    assert codes(validate_agent(agent, str(metadata_dir))) == [("missing_package_xml", "dependent_metadata_dir")]
+
+
+def test_missing_invocation_target(agent, metadata_dir):
+    agent["topics"][0]["actions"][0]["invocation_target"] = "RefundService"
+
+    assert codes(validate_agent(agent, str(metadata_dir))) == [
+        ("missing_invocation_target", "topics[0].actions[0].invocation_target"),
+    ]
+
+
+def test_invocation_target_checked_only_for_apex(agent, metadata_dir):
+    action = agent["topics"][0]["actions"][0]
+    action["invocation_target"] = "Refund_Flow"
+    action["invocation_target_type"] = "flow"
+
+    assert validate_agent(agent, str(metadata_dir)) == []
+
+
+def test_bundled_dependent_metadata_dir(agent):
+    agent["topics"][0]["actions"][0]["invocation_target"] = "OrderManagementService"
+
+    assert validate_agent(agent, str(ASSETS / "dependent_metadata_dir" / "order_management")) == []
+
+
+def test_reports_every_problem(agent):
+    agent["name"] = ""
+    agent["variables"][0]["data_type"] = "Number"
+    agent["topics"].append(copy.deepcopy(agent["topics"][0]))
+
+    assert [code for code, _ in codes(validate_agent(agent))] == [
+        "missing_name",
+        "unsupported_data_type",
+        "duplicate_topic_name",
+        "duplicate_action_name",
+    ]
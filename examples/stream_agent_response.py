@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""Example script demonstrating how to stream an agent's reply as it is generated."""
+
+import copy
+import json
+import time
+import uuid
+import argparse
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+import requests
+
+AGENT_API_URL = "https://api.salesforce.com/einstein/ai-agent/v1"
+
+
+class AgentStream:
+    """
+    Minimal Agent API client that streams agent replies using server-sent events.
+
+    The Agent API requires a connected app with the client credentials flow enabled.
+    """
+
+    def __init__(self, my_domain: str, client_id: str, client_secret: str):
+        """
+        Initialize the client.
+
+        Args:
+            my_domain: The My Domain host of the org, e.g. mycompany.my.salesforce.com
+            client_id: The consumer key of the connected app
+            client_secret: The consumer secret of the connected app
+        """
+        self.my_domain = my_domain
+        self.http = requests.Session()
+        response = self.http.post(
+            f"https://{my_domain}/services/oauth2/token",
+            data={
+                "grant_type": "client_credentials",
+                "client_id": client_id,
+                "client_secret": client_secret,
+            },
+        )
+        response.raise_for_status()
+        self.http.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+    def clone(self) -> "AgentStream":
+        """Return a client using the same access token over its own HTTP session, for use from another thread."""
+        client = copy.copy(self)
+        client.http = requests.Session()
+        client.http.headers.update(self.http.headers)
+        return client
+
+    def start_session(self, agent_id: str) -> str:
+        """
+        Start a streaming conversation with an agent.
+
+        Args:
+            agent_id: The id of the agent (BotDefinition record id)
+        Returns:
+            The Agent API session id
+        """
+        response = self.http.post(
+            f"{AGENT_API_URL}/agents/{agent_id}/sessions",
+            json={
+                "externalSessionKey": str(uuid.uuid4()),
+                "instanceConfig": {"endpoint": f"https://{self.my_domain}"},
+                "streamingCapabilities": {"chunkTypes": ["Text"]},
+                "bypassUser": True,
+            },
+        )
+        response.raise_for_status()
+        return response.json()["sessionId"]
+
+    def stream_message(self, session_id: str, text: str, sequence_id: int) -> Iterator[Dict[str, Any]]:
+        """
+        Send a message and yield the agent's events as they arrive.
+
+        Text chunks arrive as `TextChunk` messages, action progress as `ProgressIndicator`
+        messages, and the complete reply as an `Inform` message before `EndOfTurn`. The
+        message type is read from the event data rather than the SSE event name.
+
+        Args:
+            session_id: The Agent API session id
+            text: The user message
+            sequence_id: Increasing number of the message within the session
+        Yields:
+            Dictionaries with the message type, the SSE event name and the parsed data
+        """
+        with self.http.post(
+            f"{AGENT_API_URL}/sessions/{session_id}/messages/stream",
+            headers={"Accept": "text/event-stream"},
+            json={"message": {"sequenceId": sequence_id, "type": "Text", "text": text}},
+            stream=True,
+        ) as response:
+            response.raise_for_status()
+            # Server-sent events are always UTF-8, requests would otherwise assume ISO-8859-1
+            response.encoding = "utf-8"
+            event: Optional[str] = None
+            data = []
+            for line in response.iter_lines(decode_unicode=True):
+                if line:
+                    field, _, value = line.partition(":")
+                    if field == "event":
+                        event = value.strip()
+                    elif field == "data":
+                        data.append(value.strip())
+                    continue
+                # A blank line ends the current event
+                if data:
+                    parsed = json.loads("\n".join(data))
+                    message_type = (parsed.get("message") or {}).get("type")
+                    yield {"type": message_type, "event": event, "data": parsed}
+                    if message_type == "EndOfTurn":
+                        return
+                event, data = None, []
+
+    def end_session(self, session_id: str) -> None:
+        """End an Agent API session."""
+        self.http.delete(
+            f"{AGENT_API_URL}/sessions/{session_id}",
+            headers={"x-session-end-reason": "UserRequest"},
+        )
+
+
+class AgentSessionPool:
+    """
+    Pool of pre-created Agent API sessions, so the first message of a conversation
+    does not wait for a session to be created.
+
+    A background thread keeps `size` idle sessions ready per agent and ends sessions
+    that stayed in the pool longer than `idle_timeout` seconds.
+    """
+
+    def __init__(self, client: AgentStream, size: int = 2, idle_timeout: float = 600, interval: float = 5):
+        """
+        Initialize the pool.
+
+        Args:
+            client: The Agent API client used to start and end sessions
+            size: Number of idle sessions kept ready per agent
+            idle_timeout: Seconds after which an unused session is ended
+            interval: Seconds between refill and expiry checks
+        """
+        self.client = client
+        # requests sessions are not thread-safe, the background thread uses its own
+        self._background_client = client.clone()
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.interval = interval
+        self._idle: Dict[str, Deque[Tuple[str, float]]] = {}
+        self._lock = threading.Lock()
+        self._refill_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._maintain, name="agent-session-pool", daemon=True)
+        self._thread.start()
+
+    def prewarm(self, agent_id: str) -> None:
+        """Start keeping idle sessions ready for an agent, returns without waiting for them."""
+        with self._lock:
+            self._idle.setdefault(agent_id, deque())
+        self._wake.set()
+
+    def acquire(self, agent_id: str) -> str:
+        """
+        Take a session for a new conversation with an agent.
+
+        Args:
+            agent_id: The id of the agent
+        Returns:
+            A warm session id, or a newly started one if none is ready
+        """
+        with self._lock:
+            idle = self._idle.setdefault(agent_id, deque())
+            session = idle.popleft() if idle else None
+        # Replace the session in the background for the next conversation
+        self._wake.set()
+        if session is not None:
+            return session[0]
+        return self.client.start_session(agent_id)
+
+    def close(self) -> None:
+        """Stop the background thread and end all idle sessions."""
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        with self._lock:
+            sessions = [session_id for idle in self._idle.values() for session_id, _ in idle]
+            self._idle.clear()
+        for session_id in sessions:
+            self.client.end_session(session_id)
+
+    def _maintain(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            with self._lock:
+                agent_ids = list(self._idle)
+            for agent_id in agent_ids:
+                try:
+                    self._expire(agent_id)
+                    self._refill(agent_id)
+                except Exception as e:
+                    # Keep the thread alive, a failed round is retried on the next one
+                    print(f"Error maintaining sessions for agent {agent_id}: {e}")
+
+    def _expire(self, agent_id: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(agent_id, deque())
+            expired = [session for session in idle if now - session[1] >= self.idle_timeout]
+            for session in expired:
+                idle.remove(session)
+        for session_id, _ in expired:
+            self._background_client.end_session(session_id)
+
+    def _refill(self, agent_id: str) -> None:
+        with self._refill_lock:
+            with self._lock:
+                missing = self.size - len(self._idle.get(agent_id, ()))
+            for _ in range(missing):
+                if self._stop.is_set():
+                    # The pool is closing, its sessions would only be ended again
+                    return
+                session_id = self._background_client.start_session(agent_id)
+                with self._lock:
+                    self._idle.setdefault(agent_id, deque()).append((session_id, time.monotonic()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream replies from an Agentforce agent')
+    parser.add_argument('--my_domain', required=True, help='My Domain host, e.g. mycompany.my.salesforce.com')
+    parser.add_argument('--client_id', required=True, help='Connected app consumer key')
+    parser.add_argument('--client_secret', required=True, help='Connected app consumer secret')
+    parser.add_argument('--agent_id', required=True, help='Id of the agent (BotDefinition record id)')
+    args = parser.parse_args()
+
+    client = AgentStream(args.my_domain, args.client_id, args.client_secret)
+    # A session is created in the background while the user types the first message
+    pool = AgentSessionPool(client, size=1)
+    pool.prewarm(args.agent_id)
+    print("Type a message, /new to start a new conversation, or an empty line to quit.")
+    session_id = None
+    sequence_id = 0
+    try:
+        while True:
+            message = input("User: ").strip()
+            if not message:
+                break
+            if message == "/new":
+                # The next message uses the warm session the pool created meanwhile
+                if session_id:
+                    client.end_session(session_id)
+                session_id = None
+                continue
+            if session_id is None:
+                session_id = pool.acquire(args.agent_id)
+                sequence_id = 0
+            sequence_id += 1
+            print("Agent: ", end="", flush=True)
+            streamed = False
+            for event in client.stream_message(session_id, message, sequence_id):
+                message_data = event["data"].get("message", {})
+                if event["type"] == "TextChunk":
+                    # Print each chunk as soon as it arrives
+                    print(message_data.get("message", ""), end="", flush=True)
+                    streamed = True
+                elif event["type"] == "ProgressIndicator":
+                    print(f"[{message_data.get('message', 'Working...')}] ", end="", flush=True)
+                elif event["type"] == "Inform" and not streamed:
+                    # Replies that were not streamed in chunks arrive complete
+                    print(message_data.get("message", ""), end="", flush=True)
+            print()
+    finally:
+        if session_id:
+            client.end_session(session_id)
+        pool.close()
+
+if __name__ == "__main__":
+    main()